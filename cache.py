@@ -0,0 +1,130 @@
+import hashlib
+import io
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+
+from src.data.resources import Resource, ResourceRegistry
+
+# Bump whenever the pickled classes change in an incompatible way, so that
+# stale entries are never unpickled into the new data model
+CACHE_VERSION = 3
+
+CACHE_EXTENSION = ".pickle"
+
+def default_cache_directory() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join(Path.home(), ".cache"))
+    return Path(base) / "freeda"
+
+class CachePickler(pickle.Pickler):
+    # Resources are stored by name and re-bound to the current catalog on load,
+    # so that cached objects share the Resource instances of the compilation
+    def persistent_id(self, obj):
+        if isinstance(obj, Resource):
+            return ("resource", obj.name)
+        return None
+
+class CacheUnpickler(pickle.Unpickler):
+    def __init__(self, file, resources: ResourceRegistry):
+        super().__init__(file)
+        self.resources = resources
+
+    def persistent_load(self, pid):
+        kind, name = pid
+        if kind != "resource":
+            raise pickle.UnpicklingError(f"Unsupported persistent object {kind}")
+        return self.resources[name]
+
+class ModelCache:
+    def __init__(self, directory: str = None, max_size: int = 512 * 1024 * 1024):
+        self.directory = Path(directory) if directory is not None else default_cache_directory()
+        self.max_size = max_size
+
+    def key(self, kind: str, content: bytes, resources_data: dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{CACHE_VERSION}:{kind}:".encode())
+        digest.update(json.dumps(resources_data, sort_keys=True, default=str).encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / (key + CACHE_EXTENSION)
+
+    def get(self, key: str, resources: ResourceRegistry) -> Any:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            obj = CacheUnpickler(io.BytesIO(content), resources).load()
+        except Exception:
+            # Corrupted or incompatible entry: drop it and rebuild
+            path.unlink(missing_ok=True)
+            return None
+
+        # Refresh the modification time, which drives LRU eviction
+        os.utime(path)
+        return obj
+
+    def put(self, key: str, obj: Any):
+        os.makedirs(self.directory, exist_ok=True)
+
+        buffer = io.BytesIO()
+        CachePickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+
+        # Write-then-rename, so that concurrent runs never read partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, self.path(key))
+
+        self.evict()
+
+    def entries(self) -> list[tuple[Path, os.stat_result]]:
+        if not self.directory.exists():
+            return []
+
+        result = []
+        for p in self.directory.glob("*" + CACHE_EXTENSION):
+            try:
+                result.append((p, p.stat()))
+            except FileNotFoundError:
+                pass
+        return result
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda e: e[1].st_mtime)
+        total = sum(s.st_size for _, s in entries)
+        for p, s in entries:
+            if total <= self.max_size:
+                break
+            p.unlink(missing_ok=True)
+            total -= s.st_size
+
+    def clear(self):
+        for p, _ in self.entries():
+            p.unlink(missing_ok=True)
+
+def load_cached(
+    cache: ModelCache,
+    kind: str,
+    content: bytes,
+    resources: ResourceRegistry,
+    resources_data: dict[str, Any],
+    build: Callable[[], Any]
+) -> Any:
+    if cache is None:
+        return build()
+
+    key = cache.key(kind, content, resources_data)
+    obj = cache.get(key, resources)
+    if obj is None:
+        obj = build()
+        cache.put(key, obj)
+    return obj
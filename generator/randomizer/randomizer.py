@@ -2,12 +2,15 @@
 
 import argparse
 import random
-import yaml
 import os
+import sys
 from pathlib import Path
 
 import networkx as nx
 
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+from reader import dump_yaml, dump_json
+
 from components import generate_app
 from infrastructure import generate_infrastructure
 from resources import generate_resources
@@ -130,6 +133,11 @@ if __name__ == "__main__":
         ],
         default="complete"
     )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Write the generated files as JSON instead of YAML"
+    )
 
     args = parser.parse_args()
 
@@ -151,12 +159,13 @@ if __name__ == "__main__":
                 print("############################################")
                 print("# " + filename + ".yaml")
                 print("############################################")
-                print(yaml.dump(content))
+                print(dump_yaml(content))
                 print()
         else:
             generated_path = Path(args.output) / str(i).zfill(z_fill_amount)
             os.makedirs(generated_path, exist_ok=True)
 
+            extension, dump = (".json", dump_json) if args.json else (".yaml", dump_yaml)
             for filename, content in r.items():
-                with open(generated_path / (filename + ".yaml"), "w") as f:
-                    yaml.dump(content, f)
+                with open(generated_path / (filename + extension), "w") as f:
+                    dump(content, f)
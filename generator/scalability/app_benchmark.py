@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from instances import generate_instance, add_dependencies
+from loader import load_application, load_infrastructure, load_resources
+from src.data.resources import default_resources
+from src.language.intermediate_language import IntermediateStructure
+
+def measure(components, args):
+    instance = generate_instance(
+        components,
+        args.flavours,
+        args.resources,
+        args.nodes,
+        args.components_graph,
+        "complete",
+        args.seed
+    )
+    add_dependencies(instance["components"])
+
+    resources_data = dict(default_resources)
+    resources_data.update(instance["resources"])
+    resources = load_resources(resources_data)
+    infrastructure = load_infrastructure(instance["infrastructure"], resources)
+    app = load_application(instance["components"], resources)
+
+    # The infrastructure is tiny: the build time is the application side
+    start = time.perf_counter()
+    IntermediateStructure(app, infrastructure, "incremental")
+    elapsed = time.perf_counter() - start
+
+    return len(app.dependencies), elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the application side build time of the intermediate structure.")
+    parser.add_argument("-c", "--components", type=int, nargs="+", help="Numbers of components to generate", default=[500, 1000, 2000, 4000])
+    parser.add_argument("-f", "--flavours", type=int, help="Max number of flavours to generate for each components", default=3)
+    parser.add_argument("-n", "--nodes", type=int, help="Number of nodes to generate", default=2)
+    parser.add_argument("-r", "--resources", type=int, help="Number of resources to generate", default=8)
+    parser.add_argument("-g", "--components-graph", type=str, help="Graph type for the uses", default="gn")
+    parser.add_argument("-s", "--seed", type=int, help="Random seed", default=0)
+    args = parser.parse_args()
+
+    print(f"{'components':>10} {'dependencies':>12} {'build (s)':>10} {'us/dependency':>14}")
+    for c in args.components:
+        dependencies, elapsed = measure(c, args)
+        print(f"{c:>10} {dependencies:>12} {elapsed:>10.3f} {elapsed / max(dependencies, 1) * 1e6:>14.1f}")
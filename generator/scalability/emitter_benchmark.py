@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import product
+from typing import Callable
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from src.translators.minizinc.utils import construct_dense
+
+# Former emitter of the translators, a callback and a dict probe per cell,
+# kept as the reference output
+def batcher(iterable, n):
+    result = []
+    i = 0
+    while i < len(iterable):
+        result.append(iterable[i:i+n])
+        i += n
+    return result
+
+def matrix_creator(
+    batched_indexes: list[tuple],
+    indexes: list[tuple[set, str]],
+    values: dict,
+    n: int,
+    no_value: Callable[[int], str]
+):
+    if n == 1:
+        return (
+            "\t" + ", ".join([
+                str(values[i]) if i in values else str(no_value(i))
+                for i in batched_indexes
+            ]) + ", % " + str(batched_indexes[0][-2])
+        )
+    if n == 2:
+        return (
+            "\t%" + ", ".join(indexes[-1][0]) + "\n" +
+            "\n".join([
+                matrix_creator(i, indexes, values, n - 1, no_value)
+                for i in batched_indexes
+            ])
+        )
+
+    result = ""
+    for i, e in enumerate(batched_indexes):
+        idxs = indexes[0][0]
+        idx = list(idxs.keys())[i] if isinstance(idxs, dict) else idxs[i]
+
+        result += (
+            "\n\t% " + idx +
+            "\n" + matrix_creator(e, indexes[1:], values, n - 1, no_value) +
+            "\n"
+        )
+    return result
+
+def construct_explicit(
+    values: dict,
+    indexes: list[tuple[set, str]],
+    no_value: Callable[[int], str]
+) -> str:
+    only_indexes = list(product(*(i[0] for i in indexes)))
+    batched_indexes = only_indexes
+    for index_values, _ in list(reversed(indexes))[:-1]:
+        batched_indexes = batcher(batched_indexes, len(index_values))
+
+    return matrix_creator(
+        batched_indexes,
+        indexes,
+        values,
+        len(indexes),
+        no_value
+    ) + "\n]);"
+
+def depreq(components, flavours, resources, density, seed):
+    # depReq indexes and a sparse set of requirements, like in the models
+    random.seed(seed)
+    comps = [f"c{i}" for i in range(components)]
+    flavs = [f"f{i}" for i in range(flavours)]
+    res = [f"r{i}" for i in range(resources)]
+    minimization = {r : random.random() < 0.5 for r in res}
+
+    values = {
+        (cs, f, cd, r) : random.randint(1, 1000)
+        for cs in comps
+        for f in flavs
+        for cd in comps
+        for r in res
+        if random.random() < density
+    }
+    indexes = [(comps, "Comps"), (flavs, "Flavs"), (comps, "Comps"), (res, "Res")]
+    return values, indexes, minimization
+
+def measure(components, args):
+    values, indexes, minimization = depreq(
+        components,
+        args.flavours,
+        args.resources,
+        args.density,
+        args.seed
+    )
+    names = {r : "MIN_RBOUNDS" if m else "MAX_RBOUNDS" for r, m in minimization.items()}
+
+    start = time.perf_counter()
+    explicit = construct_explicit(values, indexes, lambda i : names[i[-1]])
+    explicit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dense = construct_dense(values, indexes, [names[r] for r in indexes[-1][0]])
+    dense_time = time.perf_counter() - start
+
+    if explicit != dense:
+        raise AssertionError(f"Different output for {components} components")
+
+    cells = components * args.flavours * components * args.resources
+    return cells, explicit_time, dense_time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the explicit and dense emitters on the depReq array.")
+    parser.add_argument("-c", "--components", type=int, nargs="+", help="Numbers of components", default=[20, 50, 100, 200])
+    parser.add_argument("-f", "--flavours", type=int, help="Number of flavours", default=3)
+    parser.add_argument("-r", "--resources", type=int, help="Number of resources", default=8)
+    parser.add_argument("-d", "--density", type=float, help="Fraction of explicit requirements", default=0.01)
+    parser.add_argument("-s", "--seed", type=int, help="Random seed", default=0)
+    args = parser.parse_args()
+
+    print(f"{'components':>10} {'cells':>12} {'explicit (s)':>13} {'dense (s)':>10} {'speedup':>8}")
+    for c in args.components:
+        cells, explicit_time, dense_time = measure(c, args)
+        print(f"{c:>10} {cells:>12} {explicit_time:>13.3f} {dense_time:>10.3f} {explicit_time / dense_time:>8.1f}")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from instances import generate_instance
+from loader import load_application, load_infrastructure, load_resources
+from src.data.resources import default_resources
+from src.language.intermediate_language import IntermediateStructure
+
+def measure(nodes, args):
+    instance = generate_instance(
+        args.components,
+        args.flavours,
+        args.resources,
+        nodes,
+        "gn",
+        args.infrastructure_graph,
+        args.seed
+    )
+
+    resources_data = dict(default_resources)
+    resources_data.update(instance["resources"])
+    resources = load_resources(resources_data)
+    infrastructure = load_infrastructure(instance["infrastructure"], resources)
+    app = load_application(instance["components"], resources)
+
+    # The application is tiny: the build time is the infrastructure side
+    start = time.perf_counter()
+    IntermediateStructure(app, infrastructure, "incremental")
+    elapsed = time.perf_counter() - start
+
+    return len(infrastructure.links), elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the infrastructure side build time of the intermediate structure.")
+    parser.add_argument("-n", "--nodes", type=int, nargs="+", help="Numbers of nodes to generate", default=[100, 200, 400, 800])
+    parser.add_argument("-c", "--components", type=int, help="Number of components to generate", default=5)
+    parser.add_argument("-f", "--flavours", type=int, help="Max number of flavours to generate for each components", default=3)
+    parser.add_argument("-r", "--resources", type=int, help="Number of resources to generate", default=8)
+    parser.add_argument("-i", "--infrastructure-graph", type=str, help="Graph type for the infrastructure", default="complete")
+    parser.add_argument("-s", "--seed", type=int, help="Random seed", default=0)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'links':>10} {'build (s)':>10} {'us/link':>10}")
+    for n in args.nodes:
+        links, elapsed = measure(n, args)
+        print(f"{n:>8} {links:>10} {elapsed:>10.3f} {elapsed / max(links, 1) * 1e6:>10.1f}")
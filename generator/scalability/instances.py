@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../randomizer/"))
+import randomizer
+
+def complete_application(app):
+    # The randomizer does not generate energy values, and lists dependency
+    # requirements directly: fill them in as the loader expects
+    for c in app["components"].values():
+        for f in c["flavours"].values():
+            f.setdefault("energy", 1)
+
+    for flavours in app["requirements"]["dependencies"].values():
+        for targets in flavours.values():
+            for target, requirements in targets.items():
+                if "requirements" not in requirements:
+                    targets[target] = {"requirements" : requirements, "energy" : 1}
+
+    return app
+
+def add_dependencies(app, resource="latency"):
+    # One dependency for each used component, requiring some of the resource
+    dependencies = app["requirements"]["dependencies"]
+    for c_name, c in app["components"].items():
+        for f_name, f in c["flavours"].items():
+            for used in f.get("uses", []):
+                target = used["component"] if isinstance(used, dict) else used
+                dependencies.setdefault(c_name, {}).setdefault(f_name, {})[target] = {
+                    "requirements" : {resource : random.randint(1, 100)},
+                    "energy" : 1
+                }
+
+    return app
+
+def generate_instance(
+    components,
+    flavours,
+    resources,
+    nodes,
+    components_graph,
+    infrastructure_graph,
+    seed=0
+):
+    random.seed(seed)
+    instance = randomizer.randomize(
+        1,
+        components,
+        flavours,
+        resources,
+        nodes,
+        components_graph,
+        infrastructure_graph
+    )[0]
+    complete_application(instance["components"])
+    return instance
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from instances import generate_instance
+from loader import load_application, load_infrastructure, load_resources
+from src.data.resources import default_resources
+from src.language.intermediate_language import IntermediateStructure
+from src.translators.minizinc.data import DataSection, DATA_SECTIONS
+from src.translators.minizinc.dzn import DZNTranslator
+from src.translators.minizinc.json_data import JSONTranslator
+from src.translators.minizinc.mzn import DECLARATIONS
+
+# Declarations of the data items only, to load the data files without solving
+data_model = "\n".join(
+    [
+        "enum Res = C(CRes) ++ N(NRes);",
+        "set of int: CompFlavs = 1..sum(c in Comps)(length(Flav[c]));",
+        "set of int: Nodes0 = {0} union Nodes;"
+    ] + [
+        DECLARATIONS[name] + name + ";"
+        for names in DATA_SECTIONS
+        for name in names
+    ]
+)
+
+def structure(nodes, args):
+    instance = generate_instance(
+        args.components,
+        args.flavours,
+        args.resources,
+        nodes,
+        "gn",
+        args.infrastructure_graph,
+        args.seed
+    )
+
+    resources_data = dict(default_resources)
+    resources_data.update(instance["resources"])
+    resources = load_resources(resources_data)
+    infrastructure = load_infrastructure(instance["infrastructure"], resources)
+    app = load_application(instance["components"], resources)
+    return IntermediateStructure(app, infrastructure, "incremental")
+
+def generate(translator, path):
+    # Each format computes its own data section, like in separate runs
+    start = time.perf_counter()
+    translator.write_to_file(path)
+    return time.perf_counter() - start
+
+def load(minizinc, model_path, data_path):
+    start = time.perf_counter()
+    subprocess.run(
+        [minizinc, "--instance-check-only", model_path, data_path],
+        check=True,
+        stdout=subprocess.DEVNULL
+    )
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the generation and MiniZinc load times of the dzn and json data.")
+    parser.add_argument("-n", "--nodes", type=int, nargs="+", help="Numbers of nodes to generate", default=[50, 100, 200])
+    parser.add_argument("-c", "--components", type=int, help="Number of components to generate", default=20)
+    parser.add_argument("-f", "--flavours", type=int, help="Max number of flavours to generate for each components", default=3)
+    parser.add_argument("-r", "--resources", type=int, help="Number of resources to generate", default=8)
+    parser.add_argument("-i", "--infrastructure-graph", type=str, help="Graph type for the infrastructure", default="erdos_renyi")
+    parser.add_argument("-s", "--seed", type=int, help="Random seed", default=0)
+    args = parser.parse_args()
+
+    minizinc = shutil.which("minizinc")
+    if minizinc is None:
+        print("minizinc not found in the PATH, load times are not measured", file=sys.stderr)
+
+    directory = tempfile.mkdtemp()
+    model_path = os.path.join(directory, "data.mzn")
+    with open(model_path, "w") as f:
+        f.write(data_model)
+
+    print(
+        f"{'nodes':>6} {'dzn (MB)':>9} {'json (MB)':>10} {'dzn (s)':>8} {'json (s)':>9}"
+        + (f" {'load dzn (s)':>13} {'load json (s)':>14}" if minizinc is not None else "")
+    )
+    for n in args.nodes:
+        s = structure(n, args)
+        dzn_path = os.path.join(directory, f"{n}.dzn")
+        json_path = os.path.join(directory, f"{n}.json")
+        dzn_time = generate(DZNTranslator(s, data=DataSection(s)), dzn_path)
+        json_time = generate(JSONTranslator(s, data=DataSection(s)), json_path)
+
+        line = (
+            f"{n:>6} {os.path.getsize(dzn_path) / 2 ** 20:>9.2f} {os.path.getsize(json_path) / 2 ** 20:>10.2f}"
+            + f" {dzn_time:>8.3f} {json_time:>9.3f}"
+        )
+        if minizinc is not None:
+            line += f" {load(minizinc, model_path, dzn_path):>13.3f} {load(minizinc, model_path, json_path):>14.3f}"
+        print(line)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+def generate(args, path):
+    from instances import generate_instance
+    from reader import dump_json
+
+    instance = generate_instance(
+        args.components,
+        args.flavours,
+        args.resources,
+        args.nodes,
+        args.components_graph,
+        args.infrastructure_graph,
+        args.seed
+    )
+    with open(path, "w") as f:
+        dump_json(instance, f)
+
+def measure(path):
+    from reader import load_file
+    from loader import load_application, load_infrastructure, load_resources
+    from src.data.resources import default_resources
+
+    instance = load_file(path)
+    resources_data = dict(default_resources)
+    resources_data.update(instance["resources"])
+    resources = load_resources(resources_data)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    infrastructure = load_infrastructure(instance["infrastructure"], resources)
+    app = load_application(instance["components"], resources)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ru_maxrss is in kilobytes on Linux
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"nodes:          {len(infrastructure.nodes)}")
+    print(f"links:          {len(infrastructure.links)}")
+    print(f"components:     {len(app.components)}")
+    print(f"load time:      {elapsed:.2f} s")
+    print(f"retained:       {retained / 2 ** 20:.1f} MiB (Application + Infrastructure)")
+    print(f"peak traced:    {peak / 2 ** 20:.1f} MiB")
+    print(f"peak RSS:       {max_rss:.1f} MiB (including the parsed input)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the memory used by the loaded data model.")
+    parser.add_argument("-c", "--components", type=int, help="Number of components to generate", default=1000)
+    parser.add_argument("-f", "--flavours", type=int, help="Max number of flavours to generate for each components", default=3)
+    parser.add_argument("-n", "--nodes", type=int, help="Number of nodes to generate", default=2000)
+    parser.add_argument("-r", "--resources", type=int, help="Number of resources to generate", default=8)
+    parser.add_argument("-g", "--components-graph", type=str, help="Graph type for the uses", default="gn")
+    parser.add_argument("-i", "--infrastructure-graph", type=str, help="Graph type for the infrastructure", default="erdos_renyi")
+    parser.add_argument("-s", "--seed", type=int, help="Random seed", default=0)
+    parser.add_argument("--instance", type=str, help="Reuse (or create) the generated instance at this JSON path")
+    parser.add_argument("--measure", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        measure(args.measure)
+        sys.exit(0)
+
+    path = args.instance
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "instance.json")
+    if not os.path.exists(path):
+        generate(args, path)
+
+    # Measure in a fresh process, so that the generator does not affect the RSS
+    subprocess.run([sys.executable, __file__, "--measure", path], check=True)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from instances import generate_instance
+from loader import load_application, load_infrastructure, load_resources
+from src.data.resources import default_resources
+from src.language.intermediate_language import IntermediateStructure
+from src.language.symmetry import NodeSymmetry
+
+def measure(nodes, args):
+    instance = generate_instance(
+        args.components,
+        args.flavours,
+        args.resources,
+        nodes,
+        "gn",
+        "complete",
+        args.seed
+    )
+
+    # Nodes share one of a few hardware profiles and a uniform network, like
+    # in a real fleet
+    infrastructure_nodes = list(instance["infrastructure"]["nodes"].values())
+    for i, node in enumerate(infrastructure_nodes):
+        profile = infrastructure_nodes[i % args.profiles]
+        node["capabilities"] = copy.deepcopy(profile["capabilities"])
+        node["profile"] = copy.deepcopy(profile["profile"])
+
+    links = instance["infrastructure"]["links"]
+    for link in links:
+        link["capabilities"] = copy.deepcopy(links[0]["capabilities"])
+
+    resources_data = dict(default_resources)
+    resources_data.update(instance["resources"])
+    resources = load_resources(resources_data)
+    infrastructure = load_infrastructure(instance["infrastructure"], resources)
+    app = load_application(instance["components"], resources)
+    structure = IntermediateStructure(app, infrastructure, "incremental")
+
+    start = time.perf_counter()
+    symmetry = NodeSymmetry(structure)
+    elapsed = time.perf_counter() - start
+
+    return symmetry.classes, elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the detection of interchangeable nodes on complete infrastructures.")
+    parser.add_argument("-n", "--nodes", type=int, nargs="+", help="Numbers of nodes to generate", default=[50, 100, 200, 400])
+    parser.add_argument("-p", "--profiles", type=int, help="Number of distinct node profiles", default=4)
+    parser.add_argument("-c", "--components", type=int, help="Number of components to generate", default=5)
+    parser.add_argument("-f", "--flavours", type=int, help="Max number of flavours to generate for each components", default=3)
+    parser.add_argument("-r", "--resources", type=int, help="Number of resources to generate", default=8)
+    parser.add_argument("-s", "--seed", type=int, help="Random seed", default=0)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'classes':>8} {'largest':>8} {'constraints':>12} {'detect (s)':>11}")
+    for n in args.nodes:
+        classes, elapsed = measure(n, args)
+        # One lex_greatereq constraint between consecutive nodes of a class
+        constraints = sum(len(c) - 1 for c in classes)
+        largest = max((len(c) for c in classes), default=0)
+        print(f"{n:>8} {len(classes):>8} {largest:>8} {constraints:>12} {elapsed:>11.3f}")
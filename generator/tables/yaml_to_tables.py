@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+import argparse
+import csv
+import os
+import sys
+from typing import Any
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
+
+from reader import load_file, load_columns
+from loader import (
+    load_application,
+    load_infrastructure,
+    load_infrastructure_table,
+    load_resources,
+    NODE_NAME_COLUMN,
+    NODE_COST_COLUMN,
+    NODE_CARBON_COLUMN,
+    RESOURCE_COST_PREFIX,
+    LINK_SOURCE_COLUMN,
+    LINK_TARGET_COLUMN
+)
+from src.data.resources import default_resources
+from src.language.intermediate_language import IntermediateStructure
+
+def infrastructure_to_columns(data: dict[str, Any]) -> tuple[dict[str, list], dict[str, list]]:
+    node_names = list(data["nodes"])
+    node_columns = {NODE_NAME_COLUMN : node_names}
+
+    def set_cell(columns, column, i, value, size):
+        if column not in columns:
+            columns[column] = [None] * size
+        columns[column][i] = value
+
+    for i, node_name in enumerate(node_names):
+        node_data = data["nodes"][node_name]
+        for c_name, c_value in node_data["capabilities"].items():
+            set_cell(node_columns, c_name, i, c_value, len(node_names))
+
+        profile_cost = node_data["profile"].get("cost")
+        if isinstance(profile_cost, dict):
+            for c_name, c_cost in profile_cost.items():
+                set_cell(node_columns, RESOURCE_COST_PREFIX + c_name, i, c_cost, len(node_names))
+        else:
+            set_cell(node_columns, NODE_COST_COLUMN, i, profile_cost, len(node_names))
+        set_cell(node_columns, NODE_CARBON_COLUMN, i, node_data["profile"].get("carbon", 0), len(node_names))
+
+    links = data.get("links", [])
+    link_columns = {
+        LINK_SOURCE_COLUMN : [l["connected_nodes"][0] for l in links],
+        LINK_TARGET_COLUMN : [l["connected_nodes"][1] for l in links]
+    }
+    for i, link_data in enumerate(links):
+        for c_name, c_value in link_data["capabilities"].items():
+            set_cell(link_columns, c_name, i, c_value, len(links))
+
+    return node_columns, link_columns
+
+def dump_columns(columns: dict[str, list], path: str):
+    # Lists are written as ';' separated values
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns.keys())
+        writer.writerows(
+            [
+                "" if v is None else ";".join(v) if isinstance(v, list) else v
+                for v in row
+            ]
+            for row in zip(*columns.values())
+        )
+
+def differences(expected: IntermediateStructure, actual: IntermediateStructure) -> list[str]:
+    # Insertion orders follow set iteration in the YAML path, so only the
+    # contents are compared
+    result = []
+    for name in ["nodes", "resources", "node_capabilities", "node_cost", "node_carb", "link_capacity"]:
+        e, a = getattr(expected, name), getattr(actual, name)
+        if isinstance(e, list):
+            e, a = sorted(e), sorted(a)
+        else:
+            e, a = dict(e), dict(a)
+        if e != a:
+            result.append(name)
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a YAML infrastructure as a node and a link CSV table.")
+    parser.add_argument("infrastructure", type=str, help="YAML infrastructure")
+    parser.add_argument("output", type=str, help="Prefix of the tables, written to <output>.nodes.csv and <output>.links.csv")
+    parser.add_argument("-r", "--additional-resources", type=str, help="Additional resources", default=None)
+    parser.add_argument(
+        "-c",
+        "--check",
+        metavar="components",
+        type=str,
+        help="Check that the tables give the same intermediate structure as the YAML file with this application",
+        default=None
+    )
+    args = parser.parse_args()
+
+    data = load_file(args.infrastructure)
+    node_columns, link_columns = infrastructure_to_columns(data)
+    nodes_path = args.output + ".nodes.csv"
+    links_path = args.output + ".links.csv"
+    dump_columns(node_columns, nodes_path)
+    dump_columns(link_columns, links_path)
+
+    if args.check is not None:
+        resources_data = dict(default_resources)
+        if args.additional_resources is not None:
+            resources_data.update(load_file(args.additional_resources))
+        resources = load_resources(resources_data)
+
+        app = load_application(load_file(args.check), resources)
+        table = load_infrastructure_table(
+            data["name"],
+            load_columns(nodes_path),
+            load_columns(links_path),
+            resources
+        )
+        different = differences(
+            IntermediateStructure(app, load_infrastructure(data, resources), "incremental"),
+            IntermediateStructure(app, table, "incremental")
+        )
+        if len(different) > 0:
+            print(f"The tables give a different {', '.join(different)}", file=sys.stderr)
+            sys.exit(1)
+        print("The tables give the same intermediate structure", file=sys.stderr)
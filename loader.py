@@ -2,7 +2,8 @@ from typing import Any
 
 from src.data.resources import (
     Resource,
-    ListResource
+    ListResource,
+    ResourceRegistry
 )
 from src.data.applications import (
     Flavour,
@@ -17,8 +18,10 @@ from src.data.infrastructures import (
     LinkCapability,
     Node,
     Link,
-    Infrastructure
+    Infrastructure,
+    InfrastructureTable
 )
+from src.data.property import intern_name
 from src.data.constraints import(
     AvoidConstraints,
     AffinityConstraints,
@@ -28,12 +31,8 @@ from src.data.constraints import(
     Constraints
 )
 
-def get_resource(resources: list[Resource], r_name: Resource):
-    resource = [r for r in resources if r_name == r.name]
-    if len(resource) > 0:
-        return resource[0]
-    else:
-        raise AssertionError(f"Unable to find resource \"{r_name}\". Terminating")
+def get_resource(resources: ResourceRegistry, r_name: str) -> Resource:
+    return resources[r_name]
 
 def add_to_array(array, resource, data):
     if isinstance(data, dict):
@@ -49,9 +48,38 @@ def add_to_array(array, resource, data):
             False
         ))
 
-def create_components(data, resources: list[Resource]) -> set[Component]:
+def index_components(
+    components: set[Component]
+) -> tuple[dict[str, Component], dict[tuple[str, str], Flavour]]:
+    components_by_name = {}
+    flavours_by_name = {}
+    for c in components:
+        components_by_name[c.name] = c
+        for f in c.flavours:
+            flavours_by_name[(c.name, f.name)] = f
+    return components_by_name, flavours_by_name
+
+def get_component(components_by_name: dict[str, Component], c_name: str) -> Component:
+    try:
+        return components_by_name[c_name]
+    except KeyError:
+        raise AssertionError(f"Unable to find component with name {c_name}")
+
+def get_flavour(
+    flavours_by_name: dict[tuple[str, str], Flavour],
+    c_name: str,
+    f_name: str
+) -> Flavour:
+    try:
+        return flavours_by_name[(c_name, f_name)]
+    except KeyError:
+        raise AssertionError(f"Unable to find flavour {f_name} of component {c_name}")
+
+def create_components(data, resources: ResourceRegistry) -> set[Component]:
     # Create components
     components = set()
+    components_by_name = {}
+    flavours_by_name = {}
     for component_name, component_data in data["components"].items():
         type = component_data.get("type", "service")
         must = component_data.get("must", False)
@@ -88,30 +116,29 @@ def create_components(data, resources: list[Resource]) -> set[Component]:
         else:
             importance_order = sorted([f.name for f in flavours])
 
-        components.add(Component(
+        component = Component(
             component_name,
             type,
             flavours,
             must,
             importance_order=importance_order
-        ))
+        )
+        components.add(component)
+        components_by_name[component_name] = component
+        for f in flavours:
+            flavours_by_name[(component_name, f.name)] = f
 
     # Update requirements
     for c_name, req_comp_data in data["requirements"]["components"].items():
+        component = get_component(components_by_name, c_name)
         for req_name, req_data in req_comp_data["common"].items():
-            component = [c for c in components if c.name == c_name][0]
             resource = get_resource(resources, req_name)
             add_to_array(component, resource, req_data)
 
         if "flavour-specific" in req_comp_data:
             for req_flav_name, req_flavs_data in req_comp_data["flavour-specific"].items():
+                flavour_of_component = get_flavour(flavours_by_name, c_name, req_flav_name)
                 for req_name, req_data in req_flavs_data.items():
-                    flavour_of_component = [
-                        f
-                        for c in components
-                        for f in c.flavours
-                        if c.name == c_name and f.name == req_flav_name
-                    ][0]
                     resource = get_resource(resources, req_name)
                     add_to_array(flavour_of_component, resource, req_data)
 
@@ -120,15 +147,17 @@ def create_components(data, resources: list[Resource]) -> set[Component]:
 def create_dependencies(
     data,
     components: set[Component],
-    resources: list[Resource]
+    resources: ResourceRegistry
 ) -> set[Dependency]:
+    components_by_name, flavours_by_name = index_components(components)
+
     dependencies = set()
     for from_name, from_requirements in data["requirements"]["dependencies"].items():
+        from_component = get_component(components_by_name, from_name)
         for flav_name, flav_data in from_requirements.items():
+            from_flav = get_flavour(flavours_by_name, from_name, flav_name)
             for to_name, flav_requirements in flav_data.items():
-                from_component = [c for c in components if c.name == from_name][0]
-                from_flav = [f for f in from_component.flavours if f.name == flav_name][0]
-                to_component = [c for c in components if c.name == to_name][0]
+                to_component = get_component(components_by_name, to_name)
 
                 requirements = set()
                 for req_name, req_data in flav_requirements["requirements"].items():
@@ -161,8 +190,9 @@ def create_budget(data) -> Budget:
         carbon=data["requirements"]["budget"]["carbon"]
     )
 
-def load_infrastructure(data, resources: list[Resource]) -> Infrastructure:
+def load_infrastructure(data, resources: ResourceRegistry) -> Infrastructure:
     nodes = set()
+    nodes_by_name = {}
     for node_name in data["nodes"]:
         node_data = data["nodes"][node_name]
 
@@ -182,7 +212,9 @@ def load_infrastructure(data, resources: list[Resource]) -> Infrastructure:
         profile_cost = node_data["profile"].get("cost")
         profile_carbon = node_data["profile"].get("carbon", 0)
 
-        nodes.add(Node(node_name, capabilities, profile_cost, profile_carbon))
+        node = Node(node_name, capabilities, profile_cost, profile_carbon)
+        nodes.add(node)
+        nodes_by_name[node_name] = node
 
     links = set()
     for link_data in data["links"]:
@@ -193,13 +225,13 @@ def load_infrastructure(data, resources: list[Resource]) -> Infrastructure:
 
         from_node_name, to_node_name = link_data["connected_nodes"]
         try:
-            from_node = [n for n in nodes if n.name == from_node_name][0]
-        except:
+            from_node = nodes_by_name[from_node_name]
+        except KeyError:
             raise AssertionError(f"Unable to find node with name {from_node_name}")
         try:
-            to_node = [n for n in nodes if n.name == to_node_name][0]
-        except:
-            raise AssertionError(f"Unable to find node with name {to_node}")
+            to_node = nodes_by_name[to_node_name]
+        except KeyError:
+            raise AssertionError(f"Unable to find node with name {to_node_name}")
 
         links.add(Link((from_node, to_node), capabilities))
 
@@ -209,7 +241,130 @@ def load_infrastructure(data, resources: list[Resource]) -> Infrastructure:
         links
     )
 
-def load_application(data: dict[str, Any], resouces: list[Resource]) -> Application:
+NODE_NAME_COLUMN = "name"
+NODE_COST_COLUMN = "cost"
+NODE_CARBON_COLUMN = "carbon"
+RESOURCE_COST_PREFIX = "cost:"
+LINK_SOURCE_COLUMN = "source"
+LINK_TARGET_COLUMN = "target"
+
+def parse_cell(value, list_resource: bool = False):
+    # Cells coming from CSV are strings, the ones from Arrow are already typed
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        return value
+    if list_resource:
+        return value.split(";")
+
+    for t in (int, float):
+        try:
+            return t(value)
+        except ValueError:
+            pass
+    return value
+
+def parse_column(values: list, list_resource: bool = False) -> list:
+    return [parse_cell(v, list_resource) for v in values]
+
+def load_infrastructure_table(
+    name: str,
+    node_columns: dict[str, list],
+    link_columns: dict[str, list],
+    resources: ResourceRegistry
+) -> InfrastructureTable:
+    node_names = [intern_name(str(n)) for n in node_columns[NODE_NAME_COLUMN]]
+    nodes_by_name = {}
+    for i, n in enumerate(node_names):
+        if n in nodes_by_name:
+            raise AssertionError(f"Node {n} is defined more than once")
+        nodes_by_name[n] = i
+
+    empty = [None] * len(node_names)
+    node_capabilities = []
+    for column, values in node_columns.items():
+        if column in {NODE_NAME_COLUMN, NODE_COST_COLUMN, NODE_CARBON_COLUMN} or column.startswith(RESOURCE_COST_PREFIX):
+            continue
+
+        resource = get_resource(resources, column)
+        costs = node_columns.get(RESOURCE_COST_PREFIX + column)
+        node_capabilities.append((
+            resource,
+            parse_column(values, isinstance(resource, ListResource)),
+            parse_column(costs) if costs is not None else None
+        ))
+
+    node_cost = parse_column(node_columns.get(NODE_COST_COLUMN, empty))
+    node_carb = [
+        0 if c is None else c
+        for c in parse_column(node_columns.get(NODE_CARBON_COLUMN, empty))
+    ]
+
+    link_sources = []
+    link_targets = []
+    link_capabilities = []
+    if link_columns is not None:
+        for column, sources in ((LINK_SOURCE_COLUMN, link_sources), (LINK_TARGET_COLUMN, link_targets)):
+            for n in link_columns[column]:
+                try:
+                    sources.append(nodes_by_name[str(n)])
+                except KeyError:
+                    raise AssertionError(f"Unable to find node with name {n}")
+
+        for column, values in link_columns.items():
+            if column in {LINK_SOURCE_COLUMN, LINK_TARGET_COLUMN}:
+                continue
+            resource = get_resource(resources, column)
+            link_capabilities.append((resource, parse_column(values, isinstance(resource, ListResource))))
+
+    return InfrastructureTable(
+        name,
+        node_names,
+        node_capabilities,
+        node_cost,
+        node_carb,
+        link_sources,
+        link_targets,
+        link_capabilities
+    )
+
+def merge_infrastructure_data(
+    fragments: list[dict[str, Any]],
+    fragment_names: list[str] = None
+) -> dict[str, Any]:
+    if fragment_names is None:
+        fragment_names = [str(i) for i in range(len(fragments))]
+
+    name = None
+    nodes = {}
+    nodes_origin = {}
+    links = []
+    for fragment_name, fragment in zip(fragment_names, fragments):
+        if fragment is None:
+            continue
+
+        if name is None:
+            name = fragment.get("name")
+
+        for node_name, node_data in fragment.get("nodes", {}).items():
+            if node_name in nodes:
+                raise AssertionError(
+                    f"Node {node_name} is defined both in {nodes_origin[node_name]} and in {fragment_name}"
+                )
+            nodes[node_name] = node_data
+            nodes_origin[node_name] = fragment_name
+
+        # Links are only resolved by load_infrastructure, once every node of
+        # every fragment is known
+        links.extend(fragment.get("links", []))
+
+    return {
+        "name": name,
+        "nodes": nodes,
+        "links": links
+    }
+
+def load_application(data: dict[str, Any], resouces: ResourceRegistry) -> Application:
     components = create_components(data, resouces)
     dependencies = create_dependencies(data, components, resouces)
     budget = create_budget(data)
@@ -223,7 +378,7 @@ def load_application(data: dict[str, Any], resouces: list[Resource]) -> Applicat
 
     return app
 
-def load_resources(data: dict[str, Any]) -> list[Resource]:
+def load_resources(data: dict[str, Any]) -> ResourceRegistry:
     resources = []
     for r_name, r_data in data.items():
         worst_bound = r_data.get("worst_bound")
@@ -245,7 +400,7 @@ def load_resources(data: dict[str, Any]) -> list[Resource]:
                 best_bound,
                 worst_bound
             ))
-    return resources
+    return ResourceRegistry(resources)
 
 def load_constraints(data) -> Constraints:
     component_constraints = []
@@ -1,11 +1,42 @@
 #!/usr/bin/env python
 import argparse
+import copy
+import sys
+from collections import OrderedDict
 
-import yaml
-from loader import load_application, load_infrastructure, load_resources, load_constraints, load_old_deployment
+from cache import ModelCache, load_cached
+from pathlib import Path
+
+from reader import (
+    load_bytes,
+    load_file,
+    load_many,
+    load_columns,
+    read_files,
+    expand_paths,
+    is_columnar,
+    dump_yaml
+)
+from loader import (
+    load_application,
+    load_infrastructure,
+    load_resources,
+    load_constraints,
+    load_old_deployment,
+    load_infrastructure_table,
+    merge_infrastructure_data
+)
 from src.data.resources import default_resources
+from src.data.applications import Application
+from src.data.infrastructures import Infrastructure, InfrastructureTable
 from src.language.intermediate_language import IntermediateStructure
+from src.language.serialization import save_structure, load_structure
+from src.language.presolve import Presolve
+from src.language.pruning import Pruning
+from src.language.symmetry import NodeSymmetry
+from src.translators.minizinc.data import DataSection
 from src.translators.minizinc.dzn import DZNTranslator
+from src.translators.minizinc.json_data import JSONTranslator, JSONSecondPhaseTranslator
 from src.translators.minizinc.mzn import MZNFirstPhaseTranslator, MZNSecondPhaseTranslator
 from src.translators.minizinc.unroll import MZNUnrollTranslator, MZNUnrollSecondPhaseTranslator
 from src.translators.zephyrus import ZephyrusTranslator
@@ -18,13 +49,24 @@ def main(
     additional_resources_data=None,
     constraints=None,
     old_deployment=None,
-    dump_importances_path=None
+    dump_importances_path=None,
+    save_structure_path=None,
+    load_structure_path=None,
+    presolve=False,
+    prune=False,
+    symmetry_breaking=False,
+    output_path=None,
+    sparse=False,
+    resources=None
 ):
     first_deployment = True
 
-    if additional_resources_data is not None:
-        default_resources.update(additional_resources_data)
-    resources = load_resources(default_resources)
+    # Built from the resources data, unless given with the inputs loaded from it
+    if resources is None:
+        resources_data = dict(default_resources)
+        if additional_resources_data is not None:
+            resources_data.update(additional_resources_data)
+        resources = load_resources(resources_data)
 
     if constraints is not None:
         constraints = load_constraints(constraints)
@@ -34,16 +76,37 @@ def main(
         old_deployment = load_old_deployment(old_deployment)
         first_deployment = False
 
-    infrastructure = load_infrastructure(infrastructure_data, resources)
-    app = load_application(components_data, resources)
+    if load_structure_path is not None:
+        # Compile a saved structure: only the second phase inputs may change
+        intermediate_structure = load_structure(load_structure_path)
+        if old_deployment is not None:
+            intermediate_structure.old_deployment = OrderedDict(old_deployment)
+        if constraints is not None:
+            intermediate_structure.constraints = intermediate_structure.initialize_with_constraints(constraints)
+        if intermediate_structure.old_deployment is not None:
+            first_deployment = False
+    else:
+        # Already loaded objects (e.g. from the cache) are used as they are
+        if isinstance(infrastructure_data, (Infrastructure, InfrastructureTable)):
+            infrastructure = infrastructure_data
+        else:
+            infrastructure = load_infrastructure(infrastructure_data, resources)
 
-    intermediate_structure = IntermediateStructure(
-        app,
-        infrastructure,
-        priority,
-        constraints,
-        old_deployment
-    )
+        if isinstance(components_data, Application):
+            app = components_data
+        else:
+            app = load_application(components_data, resources)
+
+        intermediate_structure = IntermediateStructure(
+            app,
+            infrastructure,
+            priority,
+            constraints,
+            old_deployment
+        )
+
+    if save_structure_path is not None:
+        save_structure(intermediate_structure, save_structure_path)
 
     if dump_importances_path is not None:
         importances = {}
@@ -58,40 +121,95 @@ def main(
             importances[c][f] = i
 
         with open(dump_importances_path, 'w') as f:
-            yaml.dump(importances, f)
+            dump_yaml(importances, f)
 
-    if format == "mzn":
-        if first_deployment:
-            translated = MZNFirstPhaseTranslator(intermediate_structure).translate()
-        else:
-            translated = MZNSecondPhaseTranslator(intermediate_structure).translate()
-    elif format == "dzn":
-        if first_deployment:
-            translated = DZNTranslator(intermediate_structure).translate()
+    # Several formats share the analyses and the data section below
+    formats = [format] if isinstance(format, str) else list(format)
+    if len(formats) > 1 and output_path is None:
+        raise ValueError("An output path is required to write several formats")
+
+    # Zephyrus is never pruned: it keeps a copy of the whole structure when
+    # written along with pruned formats
+    zephyrus_structure = intermediate_structure
+    if prune and "zephyrus" in formats and any(f in ("mzn", "dzn", "mof", "json") for f in formats):
+        zephyrus_structure = copy.deepcopy(intermediate_structure)
+
+    # Dimensions that cannot change any solution are dropped, reporting them.
+    # The integer coded arrays left are reused from there on
+    dense = None
+    if prune and any(f in ("mzn", "dzn", "mof", "json") for f in formats):
+        pruning = Pruning(intermediate_structure)
+        print(pruning.report(), file=sys.stderr)
+        dense = pruning.dense
+
+    # Placements that cannot be part of any solution are fixed beforehand
+    placements = None
+    if presolve and any(f in ("mzn", "dzn", "mof") for f in formats):
+        placements = Presolve(intermediate_structure, dense)
+
+    # Tables shared by the translators, including the integer coded arrays
+    data = None
+    if any(f in ("mzn", "dzn", "mof", "json") for f in formats):
+        data = DataSection(intermediate_structure, placements, sparse, dense)
+
+    # Interchangeable nodes, ordered in the models that can take constraints
+    symmetry = None
+    if symmetry_breaking and any(f in ("mzn", "mof") for f in formats):
+        symmetry = NodeSymmetry(intermediate_structure, data.dense)
+        print(symmetry.report(), file=sys.stderr)
+
+    translators = []
+    for f in formats:
+        if f == "mzn":
+            if first_deployment:
+                translator = MZNFirstPhaseTranslator(intermediate_structure, placements, symmetry, sparse, data)
+            else:
+                translator = MZNSecondPhaseTranslator(intermediate_structure, placements, symmetry, sparse, data)
+        elif f == "dzn":
+            if first_deployment:
+                translator = DZNTranslator(intermediate_structure, placements, sparse, data)
+            else:
+                raise Exception("Invalid output format")
+        elif f == "json": # Same data as dzn, without the presolved D
+            if first_deployment:
+                translator = JSONTranslator(intermediate_structure, placements, data)
+            else:
+                translator = JSONSecondPhaseTranslator(intermediate_structure, placements, data)
+        elif f == "mof": # Experimental: expenct bugs in the model
+            if first_deployment:
+                translator = MZNUnrollTranslator(intermediate_structure, placements, symmetry, data)
+            else:
+                translator = MZNUnrollSecondPhaseTranslator(intermediate_structure, placements, symmetry, data)
+        elif f == "zephyrus": # Only for the first deployment
+            translator = ZephyrusTranslator(zephyrus_structure)
         else:
             raise Exception("Invalid output format")
-    elif format == "mof": # Experimental: expenct bugs in the model
-        if first_deployment:
-            translated = MZNUnrollTranslator(intermediate_structure).translate()
-        else:
-            translated = MZNUnrollSecondPhaseTranslator(intermediate_structure).translate()
-    elif format == "zephyrus": # Only for the first deployment
-        translated = ZephyrusTranslator(intermediate_structure)
-    else:
-        raise Exception("Invalid output format")
+        translators.append((f, translator))
+
+    # Large models are streamed to the file as they are produced, each format
+    # to its own file when there are several
+    if output_path is not None:
+        for f, translator in translators:
+            translator.write_to_file(output_path if len(formats) == 1 else output_path + "." + f)
+        return None
 
-    return translated.to_string()
+    return translators[0][1].to_string()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="FREEDA YAML complier to solver model")
-    parser.add_argument("components", type=str, help="Components YAML file")
-    parser.add_argument("infrastructure", type=str, help="Infrastructure YAML file")
+    parser.add_argument("components", type=str, nargs="?", help="Components YAML or JSON file")
+    parser.add_argument(
+        "infrastructure",
+        type=str,
+        nargs="?",
+        help="Infrastructure YAML or JSON file, a directory or glob of infrastructure fragments, or a CSV/Parquet/Arrow node table"
+    )
     parser.add_argument(
         "--constraints",
         "-c",
         metavar="constraints",
         type=str,
-        help="Constraint YAML file",
+        help="Constraint YAML or JSON file",
     )
     parser.add_argument(
         "--old-deployment",
@@ -103,9 +221,9 @@ if __name__ == "__main__":
     parser.add_argument(
         "--format",
         "-f",
-        choices=["mzn", "dzn", "mof", "smt", "ampl", "zephyrus"],
-        default="dzn",
-        help="Output format",
+        choices=["mzn", "dzn", "json", "mof", "smt", "ampl", "zephyrus"],
+        action="append",
+        help="Output format (default dzn), can be repeated to write several formats with --output",
     )
     parser.add_argument(
         "--flavour-priority",
@@ -119,7 +237,7 @@ if __name__ == "__main__":
         "-r",
         metavar="path",
         type=str,
-        help="Resources YAML file path"
+        help="Resources YAML or JSON file path"
     )
     parser.add_argument(
         "--dump-importances",
@@ -127,23 +245,168 @@ if __name__ == "__main__":
         type=str,
         help="Location where to dump flavour importance YAML file"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the cache of loaded applications and infrastructures"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Remove every cached application and infrastructure before running"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="path",
+        type=str,
+        help="Cache location (default: $XDG_CACHE_HOME/freeda)"
+    )
+    parser.add_argument(
+        "--cache-size",
+        metavar="MB",
+        type=int,
+        default=512,
+        help="Maximum cache size in megabytes, least recently used entries are evicted first"
+    )
+    parser.add_argument(
+        "--links",
+        "-l",
+        metavar="path",
+        type=str,
+        help="CSV/Parquet/Arrow link table, used with a node table as infrastructure"
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        metavar="N",
+        type=int,
+        help="Number of processes parsing infrastructure fragments (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--save-structure",
+        metavar="path",
+        type=str,
+        help="Directory where to save the intermediate structure, to compile it again with --load-structure"
+    )
+    parser.add_argument(
+        "--load-structure",
+        metavar="path",
+        type=str,
+        help="Compile a saved intermediate structure instead of the components and infrastructure"
+    )
+    parser.add_argument(
+        "--presolve",
+        action="store_true",
+        help="Fix to zero the placements of flavours on nodes that cannot satisfy their requirements (mzn, dzn and mof)"
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Leave out the components that can never be deployed, the nodes that cannot host any flavour and the resources nothing requires (mzn, dzn, json and mof)"
+    )
+    parser.add_argument(
+        "--symmetry-breaking",
+        action="store_true",
+        help="Order the placements on interchangeable nodes (mzn and mof)"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        metavar="path",
+        type=str,
+        help="Write the model to this file as it is produced, instead of printing it (to <path>.<format> with several formats)"
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="Write the arrays whose cells are mostly default as a list of overrides (mzn and dzn)"
+    )
     args = parser.parse_args()
 
-    with open(args.infrastructure, "r") as yaml_file:
-        infrastructure_data = yaml.safe_load(yaml_file)
+    if args.load_structure is None and (args.components is None or args.infrastructure is None):
+        parser.error("the components and infrastructure are required, unless --load-structure is given")
+
+    if args.format is None:
+        args.format = ["dzn"]
+    if len(args.format) > 1 and args.output is None:
+        parser.error("--output is required with several formats")
 
-    with open(args.components, "r") as yaml_file:
-        components_data = yaml.safe_load(yaml_file)
+    cache = None
+    if not args.no_cache or args.clear_cache:
+        cache = ModelCache(args.cache_dir, args.cache_size * 1024 * 1024)
+        if args.clear_cache:
+            cache.clear()
+        if args.no_cache:
+            cache = None
 
     additional_resources_data = None
     if args.additional_resources is not None:
-        with open(args.additional_resources, "r") as yaml_file:
-            additional_resources_data = yaml.safe_load(yaml_file)
+        additional_resources_data = load_file(args.additional_resources)
+
+    resources_data = dict(default_resources)
+    if additional_resources_data is not None:
+        resources_data.update(additional_resources_data)
+    resources = load_resources(resources_data)
+
+    infrastructure_data = None
+    components_data = None
+    if args.load_structure is None:
+        infrastructure_kind = "infrastructure"
+        if is_columnar(args.infrastructure):
+            # Node table, plus optional link table
+            infrastructure_kind = "infrastructure-table"
+            infrastructure_paths = [args.infrastructure]
+            if args.links is not None:
+                infrastructure_paths.append(args.links)
+            infrastructure_contents = read_files(infrastructure_paths)
+            build_infrastructure = lambda: load_infrastructure_table(
+                Path(args.infrastructure).name.split(".")[0],
+                load_columns(args.infrastructure),
+                load_columns(args.links) if args.links is not None else None,
+                resources
+            )
+        else:
+            # The infrastructure may be split into several fragments (a directory or
+            # a glob), parsed in parallel and merged before resolving links
+            infrastructure_paths = expand_paths(args.infrastructure)
+            infrastructure_contents = read_files(infrastructure_paths)
+            build_infrastructure = lambda: load_infrastructure(
+                merge_infrastructure_data(
+                    load_many(infrastructure_contents, infrastructure_paths, args.jobs),
+                    infrastructure_paths
+                ),
+                resources
+            )
+
+        infrastructure_data = load_cached(
+            cache,
+            infrastructure_kind,
+            b"\0".join(
+                p.encode() + b"\0" + c
+                for p, c in zip(infrastructure_paths, infrastructure_contents)
+            ) if len(infrastructure_paths) > 1 or is_columnar(args.infrastructure) else infrastructure_contents[0],
+            resources,
+            resources_data,
+            build_infrastructure
+        )
+
+        with open(args.components, "rb") as f:
+            components_content = f.read()
+        components_data = load_cached(
+            cache,
+            "application",
+            components_content,
+            resources,
+            resources_data,
+            lambda: load_application(
+                load_bytes(components_content, args.components),
+                resources
+            )
+        )
 
     constraints = None
     if args.constraints is not None:
-        with open(args.constraints, "r") as yaml_file:
-            constraints = yaml.safe_load(yaml_file)
+        constraints = load_file(args.constraints)
 
     old_deployment = None
     if args.old_deployment is not None:
@@ -158,7 +421,16 @@ if __name__ == "__main__":
         additional_resources_data,
         constraints,
         old_deployment,
-        args.dump_importances
+        args.dump_importances,
+        args.save_structure,
+        args.load_structure,
+        args.presolve,
+        args.prune,
+        args.symmetry_breaking,
+        args.output,
+        args.sparse,
+        resources
     )
 
-    print(result)
+    if result is not None:
+        print(result)
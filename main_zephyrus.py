@@ -12,9 +12,10 @@ def main(
     priority,
     additional_resources_data=None
 ):
+    resources_data = dict(default_resources)
     if additional_resources_data is not None:
-        default_resources.update(additional_resources_data)
-    resources = load_resources(default_resources)
+        resources_data.update(additional_resources_data)
+    resources = load_resources(resources_data)
 
     infrastructure = load_infrastructure(infrastructure_data, resources)
     app = load_application(components_data, resources)
@@ -0,0 +1,131 @@
+import csv
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+# Prefer the libyaml bindings when PyYAML has been built with them
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+try:
+    import orjson
+
+    def parse_json(content: bytes) -> Any:
+        return orjson.loads(content)
+
+    def serialize_json(data: Any) -> str:
+        return orjson.dumps(data).decode()
+except ImportError:
+    def parse_json(content: bytes) -> Any:
+        return json.loads(content)
+
+    def serialize_json(data: Any) -> str:
+        return json.dumps(data, separators=(",", ":"))
+
+JSON_EXTENSIONS = {".json"}
+
+def looks_like_json(content: bytes) -> bool:
+    stripped = content.lstrip()
+    return stripped[:1] in (b"{", b"[")
+
+def parse_yaml(content: bytes) -> Any:
+    return yaml.load(content, Loader=SafeLoader)
+
+def load_bytes(content: bytes, path: str = None) -> Any:
+    if path is not None and Path(path).suffix.lower() in JSON_EXTENSIONS:
+        return parse_json(content)
+
+    # YAML is a superset of JSON, but the YAML parser is much slower on it:
+    # try JSON first when the content looks like it, then fall back
+    if looks_like_json(content):
+        try:
+            return parse_json(content)
+        except ValueError:
+            pass
+
+    return parse_yaml(content)
+
+def load_file(path: str) -> Any:
+    with open(path, "rb") as f:
+        content = f.read()
+    return load_bytes(content, path)
+
+def dump_yaml(data: Any, stream=None):
+    return yaml.dump(data, stream, Dumper=SafeDumper)
+
+def dump_json(data: Any, stream=None):
+    content = serialize_json(data)
+    if stream is None:
+        return content
+    stream.write(content)
+
+FRAGMENT_PATTERNS = ["*.yaml", "*.yml", "*.json"]
+
+def expand_paths(path: str) -> list[str]:
+    # A directory stands for every YAML/JSON file inside it, a glob for its
+    # matches and anything else for the single file
+    if os.path.isdir(path):
+        paths = [
+            str(p)
+            for pattern in FRAGMENT_PATTERNS
+            for p in Path(path).glob(pattern)
+        ]
+    elif glob.has_magic(path):
+        paths = glob.glob(path)
+    else:
+        return [path]
+
+    if len(paths) == 0:
+        raise FileNotFoundError(f"No input file matches {path}")
+    return sorted(paths)
+
+def read_files(paths: list[str]) -> list[bytes]:
+    contents = []
+    for p in paths:
+        with open(p, "rb") as f:
+            contents.append(f.read())
+    return contents
+
+def load_many(contents: list[bytes], paths: list[str], workers: int = None) -> list[Any]:
+    if len(contents) == 1:
+        return [load_bytes(contents[0], paths[0])]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(load_bytes, contents, paths))
+
+CSV_EXTENSIONS = {".csv"}
+ARROW_EXTENSIONS = {".arrow", ".feather", ".ipc"}
+PARQUET_EXTENSIONS = {".parquet"}
+COLUMNAR_EXTENSIONS = CSV_EXTENSIONS | ARROW_EXTENSIONS | PARQUET_EXTENSIONS
+
+def is_columnar(path: str) -> bool:
+    return Path(path).suffix.lower() in COLUMNAR_EXTENSIONS
+
+def load_columns(path: str) -> dict[str, list]:
+    extension = Path(path).suffix.lower()
+    if extension in CSV_EXTENSIONS:
+        with open(path, "r", newline="") as f:
+            rows = csv.reader(f)
+            header = next(rows)
+            columns = list(zip(*rows))
+
+        if len(columns) == 0:
+            return {h : [] for h in header}
+        return {h : list(c) for h, c in zip(header, columns)}
+
+    try:
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(f"pyarrow is required to read {path}")
+
+    if extension in PARQUET_EXTENSIONS:
+        return pyarrow.parquet.read_table(path).to_pydict()
+    return pyarrow.feather.read_table(path).to_pydict()
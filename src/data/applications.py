@@ -1,11 +1,13 @@
 from typing import Literal, Any
 
 from src.data.resources import Resource
-from src.data.property import Property
+from src.data.property import Property, intern_name
 
 ComponentType = Literal["service", "database", "integration"]
 
 class Requirement:
+    __slots__ = ("resource", "value", "soft")
+
     def __init__(
         self,
         resource: Resource,
@@ -21,6 +23,8 @@ class Requirement:
         return str(self.resource.name) + "_" + str(self.value)
 
 class Flavour:
+    __slots__ = ("name", "uses", "energy", "requirements", "importance")
+
     def __init__(
         self,
         name: str,
@@ -28,7 +32,7 @@ class Flavour:
         energy: int,
         importance: int = None
     ):
-        self.name = str(name)
+        self.name = intern_name(str(name))
         self.uses = uses
         self.energy = energy
         self.requirements = list()
@@ -38,6 +42,8 @@ class Flavour:
         self.requirements.append(requirement)
 
 class Component:
+    __slots__ = ("name", "type", "flavours", "must", "requirements", "importance_order")
+
     def __init__(
         self,
         name: str,
@@ -46,7 +52,7 @@ class Component:
         must: bool,
         importance_order: list[Any] # str | list[str] heterogeneously each indicating a name in the flavours list
     ):
-        self.name = name
+        self.name = intern_name(name)
         self.type = type
         self.flavours = flavours
         self.must = must
@@ -62,6 +68,8 @@ class Budget:
         self.carbon = carbon
 
 class Dependency:
+    __slots__ = ("source", "flavour", "target", "energy", "requirements")
+
     def __init__(
         self,
         source: Component,
@@ -74,7 +82,7 @@ class Dependency:
         self.flavour = flavour
         self.target = target
         self.energy = energy
-        self.requirements = requirements
+        self.requirements = tuple(requirements)
 
 class Application:
     def __init__(
@@ -88,3 +96,15 @@ class Application:
         self.components = components
         self.dependencies = dependencies
         self.budget = budget
+
+        self.dependencies_by_source = self.index_dependencies()
+
+    def index_dependencies(self) -> dict[tuple[str, str], list[Dependency]]:
+        # Dependencies of each flavour, keyed by (source component, flavour) names
+        index = {}
+        for d in self.dependencies:
+            index.setdefault((d.source.name, d.flavour.name), []).append(d)
+        return index
+
+    def dependencies_from(self, component_name: str, flavour_name: str) -> list[Dependency]:
+        return self.dependencies_by_source.get((component_name, flavour_name), [])
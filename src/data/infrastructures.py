@@ -1,7 +1,9 @@
 from src.data.resources import Resource
-from src.data.property import Property
+from src.data.property import Property, intern_name
 
 class NodeCapability:
+    __slots__ = ("resource", "value", "cost")
+
     def __init__(
         self,
         resource: Resource,
@@ -13,6 +15,8 @@ class NodeCapability:
         self.cost = cost
 
 class LinkCapability:
+    __slots__ = ("resource", "value")
+
     def __init__(
         self,
         resource: Resource,
@@ -22,6 +26,8 @@ class LinkCapability:
         self.value = value
 
 class Node:
+    __slots__ = ("name", "capabilities", "cost", "carb")
+
     def __init__(
         self,
         name: str,
@@ -29,18 +35,74 @@ class Node:
         cost: float = None,
         carb: float = None
     ):
-        self.name = name
-        self.capabilities = capabilities
+        self.name = intern_name(name)
+        self.capabilities = tuple(capabilities)
         self.cost = cost
         self.carb = carb
 
 class Link:
+    __slots__ = ("pair", "capabilities")
+
     def __init__(self, pair: tuple[Node, Node], capabilities: set[LinkCapability]):
         self.pair = pair
-        self.capabilities = capabilities
+        self.capabilities = tuple(capabilities)
 
 class Infrastructure:
     def __init__(self, name: str, nodes: set[Node], links: set[Link]):
         self.name = name
         self.nodes = nodes
         self.links = links
+        self.adjacency = self.make_adjacency()
+
+    def make_adjacency(self) -> dict[str, list[Link]]:
+        # Outgoing links of each node, keyed by the name of the source node
+        adjacency = {n.name : [] for n in self.nodes}
+        for l in self.links:
+            adjacency.setdefault(l.pair[0].name, []).append(l)
+        return adjacency
+
+    def links_from(self, node_name: str) -> list[Link]:
+        return self.adjacency.get(node_name, [])
+
+class InfrastructureTable:
+    # Column-oriented infrastructure: one row per node and one row per link,
+    # with one column per resource. Missing values are stored as None
+    def __init__(
+        self,
+        name: str,
+        node_names: list[str],
+        node_capabilities: list[tuple[Resource, list[Property], list[float]]],
+        node_cost: list[float],
+        node_carb: list[float],
+        link_sources: list[int],
+        link_targets: list[int],
+        link_capabilities: list[tuple[Resource, list[Property]]]
+    ):
+        self.name = name
+        self.node_names = node_names
+        self.node_capabilities = node_capabilities
+        self.node_cost = node_cost
+        self.node_carb = node_carb
+        self.link_sources = link_sources
+        self.link_targets = link_targets
+        self.link_capabilities = link_capabilities
+        self.adjacency = self.make_adjacency()
+
+    def make_adjacency(self) -> list[list[int]]:
+        # Rows of the outgoing links of each node, by node row
+        adjacency = [[] for _ in self.node_names]
+        for i, s in enumerate(self.link_sources):
+            adjacency[s].append(i)
+        return adjacency
+
+    def cost_of(self, i: int):
+        # Same as Node.cost: the profile cost, or the per-resource costs
+        if self.node_cost[i] is not None:
+            return self.node_cost[i]
+
+        costs = {
+            r.name : costs[i]
+            for r, _, costs in self.node_capabilities
+            if costs is not None and costs[i] is not None
+        }
+        return costs if len(costs) > 0 else None
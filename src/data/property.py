@@ -1,3 +1,8 @@
+import sys
 from typing import Union
 
 Property = Union[str, int, float, list[str]]
+
+def intern_name(name):
+    # Names are repeated across millions of objects and IR keys: share them
+    return sys.intern(name) if isinstance(name, str) else name
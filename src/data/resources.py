@@ -1,4 +1,8 @@
-default_resources = {
+from collections import OrderedDict
+from types import MappingProxyType
+
+# Read-only: copy it before adding resources to the catalog
+default_resources = MappingProxyType({
     'cpu': {'type': 'consumable', 'optimization': 'minimization', 'worst_bound': 0},
     'ram': {'type': 'consumable', 'optimization': 'minimization', 'worst_bound': 0},
     'storage': {'type': 'consumable', 'optimization': 'minimization', 'worst_bound': 0},
@@ -9,9 +13,14 @@ default_resources = {
         'optimization': 'minimization', 'worst_bound': 0},
     'latency': {'type': 'non-consumable', 'optimization': 'maximization', 'best_bound': 0},
     'availability': {'type': 'non-consumable', 'optimization': 'minimization', 'best_bound': 100, 'worst_bound': 0}
-}
+})
 
 class Resource:
+    # Resources are shared by every compilation using the same catalog, so they
+    # cannot be changed once created: bounds found while compiling are kept by
+    # the IntermediateStructure instead
+    __slots__ = ("name", "consumable", "minimization", "best_bound", "worst_bound")
+
     def __init__(
         self,
         name: str,
@@ -20,18 +29,36 @@ class Resource:
         best_bound: int = None,
         worst_bound: int = None
     ):
-        self.name = name
-        self.consumable = consumable
-        self.minimization = minimization
-        self.best_bound = best_bound
-        self.worst_bound = worst_bound
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "consumable", consumable)
+        object.__setattr__(self, "minimization", minimization)
+        object.__setattr__(self, "best_bound", best_bound)
+        object.__setattr__(self, "worst_bound", worst_bound)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Resource \"{self.name}\" is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Resource \"{self.name}\" is immutable")
+
+    def __reduce__(self):
+        return (Resource, (self.name, self.consumable, self.minimization, self.best_bound, self.worst_bound))
 
     def __eq__(self, other):
         if isinstance(other, Resource):
             return self.name == other.name
         return False
 
+    def __hash__(self):
+        return hash(self.name)
+
+    def definition(self) -> tuple:
+        # Everything describing the resource, unlike __eq__ that only uses the name
+        return (type(self).__name__, self.name, self.consumable, self.minimization, self.best_bound, self.worst_bound)
+
 class ListResource(Resource):
+    __slots__ = ("choices",)
+
     def __init__(
         self,
         name: str,
@@ -45,4 +72,49 @@ class ListResource(Resource):
             1,
             0
         )
-        self.choices = choices
+        object.__setattr__(self, "choices", tuple(choices))
+
+    def __reduce__(self):
+        return (ListResource, (self.name, self.minimization, self.choices))
+
+    def definition(self) -> tuple:
+        return super().definition() + (self.choices,)
+
+class ResourceRegistry:
+    # Immutable and hashable catalog, so that it can be shared across
+    # compilations and threads, and used as a key
+    def __init__(self, resources: list[Resource] = None):
+        self.resources = MappingProxyType(OrderedDict(
+            (r.name, r)
+            for r in (resources if resources is not None else [])
+        ))
+        self.hash = hash(tuple(r.definition() for r in self.resources.values()))
+
+    def __getitem__(self, name: str) -> Resource:
+        try:
+            return self.resources[name]
+        except KeyError:
+            raise AssertionError(f"Unable to find resource \"{name}\". Terminating")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.resources
+
+    def __iter__(self):
+        return iter(self.resources.values())
+
+    def __len__(self) -> int:
+        return len(self.resources)
+
+    def __eq__(self, other):
+        if isinstance(other, ResourceRegistry):
+            return (
+                [r.definition() for r in self] ==
+                [r.definition() for r in other]
+            )
+        return False
+
+    def __hash__(self):
+        return self.hash
+
+    def __reduce__(self):
+        return (ResourceRegistry, (list(self),))
@@ -0,0 +1,181 @@
+import numpy as np
+
+from src.language.intermediate_language import IntermediateStructure
+from src.language.sparse import value_type, integer_mask
+
+# Index of the "no node" in every array over Nodes0
+NO_NODE = 0
+
+def scatter(shape: tuple, fill, keys: list[tuple], values: list, dtype: type):
+    # Dense array with `fill` everywhere except at `keys`, plus the masks of
+    # the cells that were explicitly given and of the ones given as integers
+    array = np.full(shape, fill, dtype=dtype)
+    explicit = np.zeros(shape, dtype=bool)
+    integer = np.full(shape, isinstance(fill, int), dtype=bool)
+    if len(keys) > 0:
+        idx = tuple(np.array(keys, dtype=np.intp).T)
+        array[idx] = values
+        explicit[idx] = True
+        integer[idx] = integer_mask(values)
+    return array, explicit, integer
+
+class DenseStructure:
+    # Integer coded view of an IntermediateStructure: names are replaced by
+    # their position in the id tables and every matrix is a NumPy array with
+    # the worst/best bound defaults already filled in. Nodes0 arrays have the
+    # "no node" at index 0, like in the MiniZinc model
+    def __init__(self, structure: IntermediateStructure):
+        self.index(structure)
+
+        self.minimization = np.array(
+            [structure.resource_minimization[r] for r in self.resources],
+            dtype=bool
+        )
+        worst, best = structure.default_bounds()
+        self.worst = np.array(worst, dtype=value_type(worst))
+        self.best = np.array(best, dtype=value_type(best))
+        self.worst_integer = integer_mask(worst)
+        self.best_integer = integer_mask(best)
+
+        self.make_component_requirements()
+        self.make_node_capabilities()
+        self.make_link_capacity()
+        self.make_cost()
+        self.make_carb()
+        self.make_importance()
+
+    def index(self, structure: IntermediateStructure):
+        self.structure = structure
+
+        self.components = list(structure.components)
+        self.flavs = list(structure.flavs)
+        self.resources = list(structure.resources)
+        self.nodes = list(structure.nodes)
+        self.nodes0 = ["0"] + self.nodes
+
+        flavs_order = {e : i for i, e in enumerate(self.flavs)}
+        self.flavours = {
+            c : sorted(f, key=lambda x: flavs_order.get(x, float('inf')))
+            for c, f in structure.flavours.items()
+        }
+        self.compflavs = [(c, f) for c, fs in self.flavours.items() for f in fs]
+
+        self.component_index = {c : i for i, c in enumerate(self.components)}
+        self.flav_index = {f : i for i, f in enumerate(self.flavs)}
+        self.compflav_index = {cf : i for i, cf in enumerate(self.compflavs)}
+        self.resource_index = {r : i for i, r in enumerate(self.resources)}
+        self.node_index = {n : i for i, n in enumerate(self.nodes0)}
+
+    def restrict(self, structure: IntermediateStructure) -> "DenseStructure":
+        # Same arrays as DenseStructure(structure) for this structure once
+        # pruned, taken from the positions left instead of built again. The
+        # defaults still hold, since pruning keeps the bounds of the whole
+        # structure
+        result = DenseStructure.__new__(DenseStructure)
+        result.index(structure)
+
+        components = [self.component_index[c] for c in result.components]
+        flavs = [self.flav_index[f] for f in result.flavs]
+        compflavs = [self.compflav_index[cf] for cf in result.compflavs]
+        resources = [self.resource_index[r] for r in result.resources]
+        nodes0 = [self.node_index[n] for n in result.nodes0]
+
+        positions = {
+            "minimization" : (resources,),
+            "worst" : (resources,),
+            "best" : (resources,),
+            "comReq" : np.ix_(compflavs, resources),
+            "nodeCap" : np.ix_(nodes0, resources),
+            "linkCap" : np.ix_(nodes0, nodes0, resources),
+            "cost" : np.ix_(nodes0, resources),
+            "carb" : (nodes0,),
+            "importance" : np.ix_(components, flavs)
+        }
+        for name, idx in positions.items():
+            for suffix in ("", "_explicit", "_integer"):
+                if hasattr(self, name + suffix):
+                    setattr(result, name + suffix, getattr(self, name + suffix)[idx])
+        return result
+
+    def make_component_requirements(self):
+        keys = []
+        values = []
+        for (c, f, r), v in self.structure.component_requirements.items():
+            keys.append((self.compflav_index[(c, f)], self.resource_index[r]))
+            values.append(v)
+
+        shape = (len(self.compflavs), len(self.resources))
+        dtype = value_type(values, self.worst)
+        self.comReq, self.comReq_explicit, self.comReq_integer = scatter(shape, 0, keys, values, dtype)
+        self.comReq[~self.comReq_explicit] = np.broadcast_to(self.worst, shape)[~self.comReq_explicit]
+        self.comReq_integer[~self.comReq_explicit] = np.broadcast_to(self.worst_integer, shape)[~self.comReq_explicit]
+
+    def make_node_capabilities(self):
+        keys = []
+        values = []
+        for (n, r), v in self.structure.node_capabilities.items():
+            keys.append((self.node_index[n], self.resource_index[r]))
+            values.append(v)
+
+        shape = (len(self.nodes0), len(self.resources))
+        dtype = value_type(values, self.best)
+        self.nodeCap, self.nodeCap_explicit, self.nodeCap_integer = scatter(shape, 0, keys, values, dtype)
+        self.nodeCap[NO_NODE] = self.best
+        self.nodeCap_integer[NO_NODE] = self.best_integer
+
+    def make_link_capacity(self):
+        keys = []
+        values = []
+        for (n1, n2, r), v in self.structure.link_capacity.items():
+            keys.append((self.node_index[n1], self.node_index[n2], self.resource_index[r]))
+            values.append(v)
+
+        shape = (len(self.nodes0), len(self.nodes0), len(self.resources))
+        dtype = value_type(values, self.worst, self.nodeCap.flat[:1])
+        self.linkCap, self.linkCap_explicit, self.linkCap_integer = scatter(shape, 0, keys, values, dtype)
+
+        # A node reaches itself with its own capabilities
+        nodes = np.arange(1, len(self.nodes0))
+        missing = ~self.linkCap_explicit[nodes, nodes]
+        own = np.where(self.nodeCap_explicit[nodes], self.nodeCap[nodes], 0)
+        self.linkCap[nodes, nodes] = np.where(missing, own, self.linkCap[nodes, nodes])
+        own_integer = np.where(self.nodeCap_explicit[nodes], self.nodeCap_integer[nodes], True)
+        self.linkCap_integer[nodes, nodes] = np.where(missing, own_integer, self.linkCap_integer[nodes, nodes])
+        self.linkCap_explicit[nodes, nodes] = True
+
+        # Links towards the "no node" never constrain, the others are missing
+        default = np.broadcast_to(self.worst, shape).copy()
+        default[NO_NODE, :] = self.best
+        default[:, NO_NODE] = self.best
+        self.linkCap[~self.linkCap_explicit] = default[~self.linkCap_explicit]
+        default_integer = np.broadcast_to(self.worst_integer, shape).copy()
+        default_integer[NO_NODE, :] = self.best_integer
+        default_integer[:, NO_NODE] = self.best_integer
+        self.linkCap_integer[~self.linkCap_explicit] = default_integer[~self.linkCap_explicit]
+
+    def make_cost(self):
+        keys = []
+        values = []
+        for (n, r), v in self.structure.node_cost.items():
+            # Costs of list resources are keyed by their bare choice
+            if r in self.resource_index:
+                keys.append((self.node_index[n], self.resource_index[r]))
+                values.append(v)
+
+        shape = (len(self.nodes0), len(self.resources))
+        self.cost, self.cost_explicit, self.cost_integer = scatter(shape, 0, keys, values, value_type(values))
+
+    def make_carb(self):
+        values = [0] + [self.structure.node_carb[n] for n in self.nodes]
+        self.carb = np.array(values, dtype=value_type(values))
+        self.carb_integer = integer_mask(values)
+
+    def make_importance(self):
+        keys = []
+        values = []
+        for (c, f), v in self.structure.importance.items():
+            keys.append((self.component_index[c], self.flav_index[f]))
+            values.append(v)
+
+        shape = (len(self.components), len(self.flavs))
+        self.importance, self.importance_explicit, self.importance_integer = scatter(shape, 0, keys, values, value_type(values))
@@ -1,29 +1,55 @@
 from functools import reduce
 from itertools import chain
-from collections import OrderedDict
+from operator import itemgetter
+from bisect import insort
+from collections import Counter, OrderedDict, deque
 
-from src.data.resources import Resource
+from src.data.resources import Resource, ListResource
 from src.data.applications import Application
-from src.data.infrastructures import Infrastructure
+from src.data.infrastructures import Infrastructure, InfrastructureTable, Node, Link
 from src.data.constraints import (
     Constraints,
     AvoidConstraints,
     AffinityConstraints
 )
+from src.language.sparse import SparseTensor
 
 def find_resource(resources) -> str:
     return "cpu" if "cpu" in resources else list(resources)[0]
 
+def find_cycle(nodes, graph, in_degree) -> list:
+    # Every node left with a positive in-degree has a predecessor that is left
+    # as well: walking predecessors backwards must end up in a cycle
+    left = [n for n in nodes if in_degree[n] > 0]
+    left_set = set(left)
+    predecessor = {}
+    for node in left:
+        for neighbor in graph.get(node, []):
+            if neighbor in left_set:
+                predecessor.setdefault(neighbor, node)
+
+    path = []
+    position = {}
+    current = left[0]
+    while current not in position:
+        position[current] = len(path)
+        path.append(current)
+        current = predecessor[current]
+
+    return list(reversed(path[position[current]:]))
+
 def topological_sort(nodes, graph):
     in_degree = {node: 0 for node in nodes}
     for node in graph:
         for neighbor in graph[node]:
             in_degree[neighbor] += 1
 
-    zero_in_degree = [n for n in nodes if in_degree[n] == 0]
+    # Nodes are visited in the order they become ready, ties broken by their
+    # order in `nodes`
+    zero_in_degree = deque(n for n in nodes if in_degree[n] == 0)
     topo_order = []
     while zero_in_degree:
-        current = zero_in_degree.pop(0)
+        current = zero_in_degree.popleft()
         topo_order.append(current)
 
         # Reduce entry-node degree
@@ -34,24 +60,114 @@ def topological_sort(nodes, graph):
 
     # Verify all nodes have been processed
     if len(topo_order) != len(nodes):
-        raise AssertionError("Dependency graph is not a DAG")
+        cycle = find_cycle(nodes, graph, in_degree)
+        raise AssertionError(
+            "Dependency graph is not a DAG: " +
+            " -> ".join(str(n) for n in cycle + cycle[:1])
+        )
 
     return topo_order
 
 def merge_resource_name_list(resource_list_name: str, element: str):
     return resource_list_name + "_" + element
 
+class Bounds:
+    # Maximum and minimum of a multiset of values, which can be removed again
+    def __init__(self):
+        self.values = Counter()
+        self.max = None
+        self.min = None
+
+    @classmethod
+    def of(cls, values: Counter):
+        result = cls()
+        result.values = values
+        result.max = max(values, default=None)
+        result.min = min(values, default=None)
+        return result
+
+    def add(self, value):
+        self.values[value] += 1
+        if self.max is None or value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def remove(self, value):
+        self.values[value] -= 1
+        if self.values[value] == 0:
+            del self.values[value]
+            if value == self.max:
+                self.max = max(self.values, default=None)
+            if value == self.min:
+                self.min = min(self.values, default=None)
+
+class ResourceBounds:
+    # Best and worst value of each resource found during a single compilation,
+    # starting from the bounds given in the (shared, immutable) catalog
+    def __init__(self):
+        self.best = OrderedDict()
+        self.worst = OrderedDict()
+        self.values = {}
+
+    def add(self, r: Resource):
+        if r.name not in self.best:
+            self.best[r.name] = r.best_bound
+            self.worst[r.name] = r.worst_bound
+            self.values[r.name] = Bounds()
+
+    def update(self, r: Resource, value: int):
+        self.add(r)
+        self.values[r.name].add(value)
+        self.merge(r, value)
+
+    def set(self, r: Resource, values: Counter):
+        self.values[r.name] = Bounds.of(values)
+        self.reset(r)
+
+    def remove(self, r: Resource, value: int):
+        self.values[r.name].remove(value)
+        if value == self.best[r.name] or value == self.worst[r.name]:
+            self.reset(r)
+
+    def reset(self, r: Resource):
+        # Start again from the catalog and the extremes of the values
+        values = self.values[r.name]
+        self.best[r.name] = r.best_bound
+        self.worst[r.name] = r.worst_bound
+        if values.max is not None:
+            self.merge(r, values.max)
+            self.merge(r, values.min)
+
+    def merge(self, r: Resource, value: int):
+        best = self.best[r.name]
+        worst = self.worst[r.name]
+        if r.minimization:
+            if best is None or best > value:
+                self.best[r.name] = value
+            if worst is None or worst < value:
+                self.worst[r.name] = value
+        else:
+            if best is None or best < value:
+                self.best[r.name] = value
+            if worst is None or worst > value:
+                self.worst[r.name] = value
+
 class IntermediateStructure:
     def __init__(
         self,
         app: Application,
-        infrastructure: Infrastructure,
+        infrastructure: Infrastructure | InfrastructureTable,
         flavour_order_strategy: str,
         constraints: Constraints = None,
         old_deployment: dict[str, str] = None
     ) -> None:
+        # Bounds are computed once everything is collected, and only kept up
+        # to date value by value afterwards, by the infrastructure deltas
         self.max_bound = None
         self.min_bound = None
+        self.bounds = None
+        self.resource_bounds = None
 
         self.app_name = app.name
         self.cost_budget = app.budget.cost
@@ -61,12 +177,14 @@ class IntermediateStructure:
         self.flavours = OrderedDict()
         self.importance = OrderedDict()
         self.uses = OrderedDict()
-        self.consumable_resource = set()
-        self.non_consumable_resource = set()
+        self.consumable_resource = list()
+        self.non_consumable_resource = list()
         self.list_resource = OrderedDict()
         self.resource_minimization = OrderedDict()
         self.worst_bounds = OrderedDict()
         self.best_bounds = OrderedDict()
+        self.bounded_resources = OrderedDict()
+        self.resource_references = Counter()
         self.component_requirements = OrderedDict()
         self.dependencies = OrderedDict()
         self.energy = OrderedDict()
@@ -79,7 +197,15 @@ class IntermediateStructure:
         self.node_cost = OrderedDict()
         self.node_carb = OrderedDict()
         self.link_capacity = OrderedDict()
-        self.initialize_with_infrastruture(infrastructure)
+        self.node_profile_cost = OrderedDict()
+        self.node_profile_key = OrderedDict()
+        self.neighbours = None
+        if isinstance(infrastructure, InfrastructureTable):
+            self.initialize_with_infrastructure_table(infrastructure)
+        else:
+            self.initialize_with_infrastruture(infrastructure)
+        self.compute_bounds()
+        self.update_resource_bounds()
 
         self.old_deployment = OrderedDict(old_deployment) if old_deployment is not None else None
 
@@ -92,32 +218,24 @@ class IntermediateStructure:
         )
         comp_flavs = topological_sort(comp_flavs, self.uses)
 
-        self.components = []
-        for c, _ in comp_flavs:
-            if c not in self.components:
-                self.components.append(c)
+        self.components = list(OrderedDict.fromkeys(c for c, _ in comp_flavs))
+        components_position = {c : i for i, c in enumerate(self.components)}
 
         self.must_components = sorted(
             self.must_components,
-            key=lambda x: self.components.index(x)
+            key=lambda x: components_position[x]
         )
 
         self.flavours = OrderedDict(sorted(
             self.flavours.items(),
-            key=lambda x: self.components.index(x[0])
+            key=lambda x: components_position[x[0]]
         ))
 
-        self.flavs = []
-        for fs in self.flavours.values():
-            for f in fs:
-                if f not in self.flavs:
-                    self.flavs.append(f)
+        self.flavs = list(OrderedDict.fromkeys(
+            f for fs in self.flavours.values() for f in fs
+        ))
 
-        self.consumable_resource = sorted(self.consumable_resource)
-        self.non_consumable_resource = sorted(self.non_consumable_resource)
-        self.resources = []
-        self.resources += sorted(self.consumable_resource)
-        self.resources += sorted(self.non_consumable_resource)
+        self.update_resources()
 
         self.nodes = sorted(self.nodes)
 
@@ -130,37 +248,143 @@ class IntermediateStructure:
         else:
             resource_name = merge_resource_name_list(r.name, resource_name)
 
-        if r.consumable:
-            self.consumable_resource.add(resource_name)
-        else:
-            self.non_consumable_resource.add(resource_name)
-
-        if r.worst_bound is not None:
-            self.worst_bounds[resource_name] = r.worst_bound
-            self.maybe_update_bounds(r.worst_bound)
-        if r.best_bound is not None:
-            self.best_bounds[resource_name] = r.best_bound
-            self.maybe_update_bounds(r.best_bound)
+        if self.bounds is not None:
+            if r.worst_bound is not None:
+                self.maybe_update_bounds(r.worst_bound)
+            if r.best_bound is not None:
+                self.maybe_update_bounds(r.best_bound)
+            self.resource_bounds.add(r)
 
+        self.resource_references[resource_name] += 1
+        self.bounded_resources[resource_name] = r
         self.resource_minimization[resource_name] = r.minimization
 
+    def remove_resource(self, resource_name: str):
+        # Undo one add_resource, forgetting the resource with its last use
+        r = self.bounded_resources[resource_name]
+        if self.bounds is not None:
+            if r.worst_bound is not None:
+                self.remove_bound(r.worst_bound)
+            if r.best_bound is not None:
+                self.remove_bound(r.best_bound)
+
+        self.resource_references[resource_name] -= 1
+        if self.resource_references[resource_name] == 0:
+            del self.resource_references[resource_name]
+            del self.bounded_resources[resource_name]
+            del self.resource_minimization[resource_name]
+
+    def consumable_resources(self) -> list[str]:
+        return sorted(name for name, r in self.bounded_resources.items() if r.consumable)
+
+    def update_resources(self):
+        self.consumable_resource = self.consumable_resources()
+        self.non_consumable_resource = sorted(
+            name
+            for name, r in self.bounded_resources.items()
+            if not r.consumable
+        )
+        self.resources = self.consumable_resource + self.non_consumable_resource
+
+    def compute_bounds(self):
+        # Count the collected values by (resource name, value) first: there
+        # are few distinct pairs, so the bounds are then cheap to build.
+        # Links are stored in both directions, each pair is counted once
+        values = Counter(zip(
+            map(itemgetter(-1), self.component_requirements.keys()),
+            self.component_requirements.values()
+        ))
+        values.update(zip(
+            map(itemgetter(-1), self.node_capabilities.keys()),
+            self.node_capabilities.values()
+        ))
+        link_values = Counter(
+            (r_name, v)
+            for (n1, n2, r_name), v in self.link_capacity.items()
+            if n1 <= n2
+        )
+
+        bounds = Counter()
+        resource_values = OrderedDict()
+        for resource_name, references in self.resource_references.items():
+            r = self.bounded_resources[resource_name]
+            if r.worst_bound is not None:
+                bounds[r.worst_bound] += references
+            if r.best_bound is not None:
+                bounds[r.best_bound] += references
+            resource_values.setdefault(r.name, (r, Counter()))
+
+        for (resource_name, value), count in values.items():
+            r, r_values = resource_values[self.bounded_resources[resource_name].name]
+            if resource_name != r.name:
+                # A list resource choice, either present or not
+                bounds[1] += count
+                r_values[1] += count
+                r_values[0] += count
+            else:
+                bounds[value] += count
+                r_values[value] += count
+        for (resource_name, value), count in link_values.items():
+            resource_values[resource_name][1][value] += count
+
+        self.bounds = Bounds.of(bounds)
+        self.max_bound = self.bounds.max
+        self.min_bound = self.bounds.min
+        self.resource_bounds = ResourceBounds()
+        for r, r_values in resource_values.values():
+            self.resource_bounds.add(r)
+            self.resource_bounds.set(r, r_values)
+
     def maybe_update_resource_bounds(self, r: Resource, value: int):
-        if r.minimization:
-            if r.best_bound is None or r.best_bound > value:
-                r.best_bound = value
-            if r.worst_bound is None or r.worst_bound < value:
-                r.worst_bound = value
-        else:
-            if r.best_bound is None or r.best_bound < value:
-                r.best_bound = value
-            if r.worst_bound is None or r.worst_bound > value:
-                r.worst_bound = value
+        self.resource_bounds.update(r, value)
+
+    def update_resource_bounds(self):
+        # Each (list) resource takes the bounds of its catalog resource, as
+        # found over the whole application and infrastructure
+        self.worst_bounds = OrderedDict()
+        self.best_bounds = OrderedDict()
+        for resource_name, r in self.bounded_resources.items():
+            if self.resource_bounds.worst[r.name] is not None:
+                self.worst_bounds[resource_name] = self.resource_bounds.worst[r.name]
+            if self.resource_bounds.best[r.name] is not None:
+                self.best_bounds[resource_name] = self.resource_bounds.best[r.name]
+
+    def default_bounds(self) -> tuple[list, list]:
+        # Numeric worstBounds and bestBounds of the MiniZinc model, by resource
+        max_bound = max(self.worst_bounds.values())
+        min_bound = min(self.best_bounds.values())
+        worst = [min_bound if self.resource_minimization[r] else max_bound for r in self.resources]
+        best = [max_bound if self.resource_minimization[r] else min_bound for r in self.resources]
+        return worst, best
+
+    def dependency_tensor(self) -> SparseTensor:
+        # depReq over Comps x Flavs x Comps x Res
+        worst, _ = self.default_bounds()
+        return SparseTensor.from_dict(
+            self.dependencies,
+            [self.components, self.flavs, self.components, self.resources],
+            worst
+        )
+
+    def link_tensor(self) -> SparseTensor:
+        # linkCap of the actual links, over Nodes0 x Nodes0 x Res
+        worst, _ = self.default_bounds()
+        nodes0 = ["0"] + self.nodes
+        return SparseTensor.from_dict(
+            self.link_capacity,
+            [nodes0, nodes0, self.resources],
+            worst
+        )
 
     def maybe_update_bounds(self, value: float):
-        if self.max_bound is None or value > self.max_bound:
-            self.max_bound = value
-        if self.min_bound is None or value < self.min_bound:
-            self.min_bound = value
+        self.bounds.add(value)
+        self.max_bound = self.bounds.max
+        self.min_bound = self.bounds.min
+
+    def remove_bound(self, value: float):
+        self.bounds.remove(value)
+        self.max_bound = self.bounds.max
+        self.min_bound = self.bounds.min
 
     def by_order_strategy(self, components, order_strategy) -> list[set[str]]:
         max_len = max(len(c.flavours) for c in components)
@@ -248,21 +472,11 @@ class IntermediateStructure:
                                 raise AssertionError(f"Invalid list resource choice \"{r.resource.name}\" in component {c.name}")
                             self.add_resource(r.resource, e)
                             self.component_requirements[(c.name, f.name, merge_resource_name_list(r.resource.name, e))] = 1
-                            self.maybe_update_bounds(1)
-                            self.maybe_update_resource_bounds(r.resource, 1)
-                            self.maybe_update_resource_bounds(r.resource, 0)
                     else:
                         self.add_resource(r.resource)
                         self.component_requirements[(c.name, f.name, r.resource.name)] = r.value
-                        self.maybe_update_bounds(r.value)
-                        self.maybe_update_resource_bounds(r.resource, r.value)
-
-                dependencies = [
-                    d
-                    for d in app.dependencies
-                    if d.source.name == c.name and d.flavour.name == f.name
-                ]
-                for dep in dependencies:
+
+                for dep in app.dependencies_from(c.name, f.name):
                     self.energy_dependencies[(c.name, f.name, dep.target.name)] = dep.energy
                     for r in dep.requirements:
                         self.add_resource(r.resource)
@@ -286,55 +500,261 @@ class IntermediateStructure:
             self.nodes.append(node.name)
             self.node_carb[node.name] = node.carb
 
+            node_cost = OrderedDict()
             for c in node.capabilities:
-                if isinstance(c.value, list):
-                    for e in c.value:
-                        if e not in c.resource.choices:
-                            raise AssertionError(f"Invalid list resource choice \"{c.resource.name}\" in node {node.name}")
-                        self.add_resource(c.resource, e)
-                        self.node_capabilities[(node.name, merge_resource_name_list(c.resource.name, e))] = 1
-                        self.maybe_update_bounds(1)
-                        self.maybe_update_resource_bounds(c.resource, 1)
-                        self.maybe_update_resource_bounds(c.resource, 0)
-                        self.node_cost[(node.name, e)] = c.cost if c.cost is not None else 0
-                else:
-                    self.add_resource(c.resource)
-                    self.node_capabilities[(node.name, c.resource.name)] = c.value
-                    self.maybe_update_bounds(c.value)
-                    self.maybe_update_resource_bounds(c.resource, c.value)
-                    self.node_cost[(node.name, c.resource.name)] = c.cost if c.cost is not None else 0
-
-            # If a node cost has all zero values, it means that
-            # there was a single carbon value inside the node itself. Search a
-            # consumable resource (cpu or the first one) to assign the value to
-            a_resource = find_resource(self.consumable_resource)
-            node_cost = [
-                (c, v)
-                for (n, c), v in self.node_cost.items()
-                if n == node.name
-            ]
-            if all([v == 0 for _, v in node_cost]):
-                self.node_cost[(node.name, a_resource)] = node.cost
-            self.node_cost = OrderedDict({k : v for k, v in self.node_cost.items() if v != 0})
-
-            # link matrix
-            to_nodes = [
-                l.pair[1].name
-                for l in infrastructure.links
-                if l.pair[0].name == node.name
-            ]
-            for t in to_nodes:
-                link_cap = [
-                    l.capabilities
-                    for l in infrastructure.links
-                    if l.pair[0].name == node.name and l.pair[1].name == t
-                ]
-                for link in link_cap:
-                    for c in link:
-                        self.add_resource(c.resource)
-                        self.maybe_update_resource_bounds(c.resource, c.value)
-                        self.link_capacity[(node.name, t, c.resource.name)] = c.value
-                        self.link_capacity[(t, node.name, c.resource.name)] = c.value
+                self.add_node_capability(node.name, c.resource, c.value, c.cost, node_cost)
+            self.add_node_cost(node.name, node_cost, node.cost)
+
+            # link matrix, visiting the links towards the same node together
+            links_to = OrderedDict()
+            for l in infrastructure.links_from(node.name):
+                links_to.setdefault(l.pair[1].name, []).append(l)
+            for t, links in links_to.items():
+                for link in links:
+                    for c in link.capabilities:
+                        self.add_link_capability(node.name, t, c.resource, c.value)
+
+    def add_node_capability(
+        self,
+        node_name: str,
+        resource: Resource,
+        value,
+        cost,
+        node_cost: OrderedDict
+    ):
+        if isinstance(value, list):
+            for e in value:
+                if e not in resource.choices:
+                    raise AssertionError(f"Invalid list resource choice \"{resource.name}\" in node {node_name}")
+                self.add_resource(resource, e)
+                self.node_capabilities[(node_name, merge_resource_name_list(resource.name, e))] = 1
+                if self.bounds is not None:
+                    self.maybe_update_bounds(1)
+                    self.maybe_update_resource_bounds(resource, 1)
+                    self.maybe_update_resource_bounds(resource, 0)
+                node_cost[(node_name, e)] = cost if cost is not None else 0
+        else:
+            self.add_resource(resource)
+            self.node_capabilities[(node_name, resource.name)] = value
+            if self.bounds is not None:
+                self.maybe_update_bounds(value)
+                self.maybe_update_resource_bounds(resource, value)
+            node_cost[(node_name, resource.name)] = cost if cost is not None else 0
+
+    def add_node_cost(self, node_name: str, node_cost: OrderedDict, cost):
+        # If a node cost has all zero values, it means that
+        # there was a single carbon value inside the node itself. Search a
+        # consumable resource (cpu or the first one) to assign the value to
+        a_resource = find_resource(self.consumable_resources())
+        self.node_profile_cost[node_name] = cost
+        self.node_profile_key[node_name] = None
+        if all(v == 0 for v in node_cost.values()):
+            node_cost[(node_name, a_resource)] = cost
+            self.node_profile_key[node_name] = (node_name, a_resource)
+
+        for k, v in node_cost.items():
+            if v != 0:
+                self.node_cost[k] = v
+
+    def add_link_capability(self, from_name: str, to_name: str, resource: Resource, value):
+        # A link capability replaces the one of the same link in either direction
+        if (from_name, to_name, resource.name) in self.link_capacity:
+            self.remove_link_capability(from_name, to_name, resource.name)
+
+        self.add_resource(resource)
+        if self.bounds is not None:
+            self.maybe_update_resource_bounds(resource, value)
+        self.link_capacity[(from_name, to_name, resource.name)] = value
+        self.link_capacity[(to_name, from_name, resource.name)] = value
+
+        if self.neighbours is not None:
+            self.neighbours.setdefault(from_name, set()).add(to_name)
+            self.neighbours.setdefault(to_name, set()).add(from_name)
+
+    def remove_link_capability(self, from_name: str, to_name: str, resource_name: str):
+        value = self.link_capacity.pop((from_name, to_name, resource_name))
+        self.link_capacity.pop((to_name, from_name, resource_name), None)
+        if self.bounds is not None:
+            self.resource_bounds.remove(self.bounded_resources[resource_name], value)
+        self.remove_resource(resource_name)
+
+    def remove_node_capability_value(self, node_name: str, resource_name: str):
+        # Undo add_node_capability for a single (possibly list) resource name
+        value = self.node_capabilities.pop((node_name, resource_name))
+        r = self.bounded_resources[resource_name]
+        if resource_name != r.name:
+            self.remove_bound(1)
+            self.resource_bounds.remove(r, 1)
+            self.resource_bounds.remove(r, 0)
+        else:
+            self.remove_bound(value)
+            self.resource_bounds.remove(r, value)
+        self.remove_resource(resource_name)
+
+    def initialize_with_infrastructure_table(self, table: InfrastructureTable):
+        for i, node_name in enumerate(table.node_names):
+            self.nodes.append(node_name)
+            self.node_carb[node_name] = table.node_carb[i]
+
+            node_cost = OrderedDict()
+            for resource, values, costs in table.node_capabilities:
+                if values[i] is not None:
+                    cost = costs[i] if costs is not None else None
+                    self.add_node_capability(node_name, resource, values[i], cost, node_cost)
+            self.add_node_cost(node_name, node_cost, table.cost_of(i))
+
+            for l in table.adjacency[i]:
+                to_name = table.node_names[table.link_targets[l]]
+                for resource, values in table.link_capabilities:
+                    if values[l] is not None:
+                        self.add_link_capability(node_name, to_name, resource, values[l])
+
+    # Infrastructure deltas: each one updates the structure in place, leaving
+    # it as if it was built again with the changed infrastructure
+
+    def links_index(self) -> dict[str, set[str]]:
+        # Neighbours of each node, built the first time a delta needs them
+        if self.neighbours is None:
+            self.neighbours = {}
+            for n1, n2, _ in self.link_capacity:
+                self.neighbours.setdefault(n1, set()).add(n2)
+        return self.neighbours
+
+    def node_cost_keys(self, node_name: str) -> list[tuple[str, str]]:
+        # Costs of list resources are keyed by their bare choice
+        return [(node_name, name) for name in self.bounded_resources] + [
+            (node_name, name[len(r.name) + 1:])
+            for name, r in self.bounded_resources.items()
+            if name != r.name
+        ]
+
+    def update_node_cost(self, node_name: str):
+        # Fall back to the node cost when no capability has a cost
+        if any(k in self.node_cost for k in self.node_cost_keys(node_name)):
+            return
+
+        key = (node_name, find_resource(self.consumable_resources()))
+        self.node_profile_key[node_name] = key
+        if self.node_profile_cost[node_name] != 0:
+            self.node_cost[key] = self.node_profile_cost[node_name]
+
+    def set_capability_cost(self, node_name: str, key: tuple[str, str], cost):
+        profile_key = self.node_profile_key[node_name]
+        if profile_key is not None:
+            self.node_cost.pop(profile_key, None)
+            self.node_profile_key[node_name] = None
+
+        if cost is not None and cost != 0:
+            self.node_cost[key] = cost
+        else:
+            self.node_cost.pop(key, None)
+        self.update_node_cost(node_name)
+
+    def updated(self):
+        self.update_resources()
+        self.update_resource_bounds()
+
+    def add_node(self, node: Node):
+        if node.name in self.node_carb:
+            raise AssertionError(f"Node {node.name} already in the infrastructure")
+
+        insort(self.nodes, node.name)
+        self.node_carb[node.name] = node.carb
+
+        node_cost = OrderedDict()
+        for c in node.capabilities:
+            self.add_node_capability(node.name, c.resource, c.value, c.cost, node_cost)
+        self.add_node_cost(node.name, node_cost, node.cost)
+        self.updated()
+
+    def remove_node(self, node_name: str):
+        if node_name not in self.node_carb:
+            raise AssertionError(f"Unable to find node {node_name}")
+
+        for to_name in self.links_index().pop(node_name, set()):
+            self.remove_link_capabilities(node_name, to_name)
+            self.neighbours[to_name].discard(node_name)
+
+        for key in self.node_cost_keys(node_name):
+            self.node_cost.pop(key, None)
+        for name in list(self.bounded_resources):
+            if (node_name, name) in self.node_capabilities:
+                self.remove_node_capability_value(node_name, name)
+
+        self.nodes.remove(node_name)
+        del self.node_carb[node_name]
+        del self.node_profile_cost[node_name]
+        del self.node_profile_key[node_name]
+        self.updated()
+
+    def remove_node_capability(self, node_name: str, resource: Resource):
+        if node_name not in self.node_carb:
+            raise AssertionError(f"Unable to find node {node_name}")
+
+        if isinstance(resource, ListResource):
+            names = [merge_resource_name_list(resource.name, e) for e in resource.choices]
+            cost_keys = [(node_name, e) for e in resource.choices]
+        else:
+            names = [resource.name]
+            cost_keys = [(node_name, resource.name)]
+
+        for name in names:
+            if (node_name, name) in self.node_capabilities:
+                self.remove_node_capability_value(node_name, name)
+        for key in cost_keys:
+            if key in self.node_cost and key != self.node_profile_key[node_name]:
+                self.set_capability_cost(node_name, key, None)
+        self.updated()
+
+    def set_node_capability(self, node_name: str, resource: Resource, value, cost=None):
+        self.remove_node_capability(node_name, resource)
+
+        node_cost = OrderedDict()
+        self.add_node_capability(node_name, resource, value, cost, node_cost)
+        for key, c in node_cost.items():
+            if c != 0:
+                self.set_capability_cost(node_name, key, c)
+        self.updated()
+
+    def set_node_cost(self, node_name: str, cost):
+        # The cost of the node as a whole, used when no capability has a cost
+        if node_name not in self.node_carb:
+            raise AssertionError(f"Unable to find node {node_name}")
+
+        self.node_profile_cost[node_name] = cost
+        profile_key = self.node_profile_key[node_name]
+        if profile_key is not None:
+            self.node_cost.pop(profile_key, None)
+            self.update_node_cost(node_name)
+
+    def set_node_carb(self, node_name: str, carb):
+        if node_name not in self.node_carb:
+            raise AssertionError(f"Unable to find node {node_name}")
+        self.node_carb[node_name] = carb
+
+    def add_link(self, link: Link):
+        from_name, to_name = link.pair[0].name, link.pair[1].name
+        for n in (from_name, to_name):
+            if n not in self.node_carb:
+                raise AssertionError(f"Unable to find node {n}")
+
+        self.links_index()
+        for c in link.capabilities:
+            self.add_link_capability(from_name, to_name, c.resource, c.value)
+        self.updated()
+
+    def remove_link_capabilities(self, from_name: str, to_name: str):
+        for name in list(self.bounded_resources):
+            if (from_name, to_name, name) in self.link_capacity:
+                self.remove_link_capability(from_name, to_name, name)
+
+    def remove_link(self, from_name: str, to_name: str):
+        self.remove_link_capabilities(from_name, to_name)
+
+        neighbours = self.links_index()
+        neighbours.get(from_name, set()).discard(to_name)
+        neighbours.get(to_name, set()).discard(from_name)
+        self.updated()
 
     def initialize_with_constraints(self, constraints: Constraints):
         result = {
@@ -0,0 +1,51 @@
+import numpy as np
+
+from src.language.intermediate_language import IntermediateStructure
+from src.language.dense import DenseStructure, NO_NODE
+
+class Presolve:
+    # Placements of a flavour on a node that the models forbid on their own,
+    # whatever else is deployed: they can be fixed to zero in D before the
+    # solver ever sees them
+    def __init__(self, structure: IntermediateStructure, dense: DenseStructure = None):
+        self.structure = structure
+        self.dense = dense if dense is not None else DenseStructure(structure)
+        self.feasible = self.feasible_placements()
+        self.rows = self.feasible.tolist()
+
+    def feasible_placements(self) -> np.ndarray:
+        # Mask over CompFlavs x Nodes0, the "no node" is never a placement
+        dense = self.dense
+        feasible = np.ones((len(dense.compflavs), len(dense.nodes0)), dtype=bool)
+        feasible[:, NO_NODE] = False
+
+        consumable = set(self.structure.consumable_resource)
+        for r, resource in enumerate(dense.resources):
+            required = dense.comReq_explicit[:, r] & (dense.comReq[:, r] != dense.worst[r])
+            requirements = dense.comReq[:, r, None]
+            capabilities = dense.nodeCap[None, :, r]
+
+            if resource not in consumable:
+                # Each placement has to satisfy the requirement by itself
+                if dense.minimization[r]:
+                    violated = requirements > capabilities
+                else:
+                    violated = requirements < capabilities
+                feasible &= ~(required[:, None] & violated)
+            elif dense.minimization[r]:
+                # A requirement above the capacity of a node cannot fit, even
+                # with the negative requirements of all the other flavours.
+                # Only capacities constraining both the MZN and MOF models
+                constrained = dense.nodeCap_explicit[:, r] & (dense.nodeCap[:, r] != dense.worst[r])
+                negative = np.minimum(np.where(required, dense.comReq[:, r], 0), 0)
+                lowest = requirements + (negative.sum() - negative)[:, None]
+                feasible &= ~(required[:, None] & constrained[None, :] & (lowest > capabilities))
+
+        for (c, f), nodes in self.structure.constraints["avoid"].items():
+            for n in nodes:
+                feasible[dense.compflav_index[(c, f)], dense.node_index[n]] = False
+
+        return feasible
+
+    def is_feasible(self, c: str, f: str, n: str) -> bool:
+        return self.rows[self.dense.compflav_index[(c, f)]][self.dense.node_index[n]]
@@ -0,0 +1,207 @@
+from collections import OrderedDict
+
+from src.language.intermediate_language import IntermediateStructure
+from src.language.presolve import Presolve
+
+class Pruning:
+    # Removes from a structure, in place, the dimensions that cannot change
+    # any solution: components that can never be deployed, nodes that cannot
+    # host any flavour and resources that nothing requires. Names are never
+    # changed, and the original dimensions are kept to map positions and
+    # deployments back. It is meant to be the last step before translation:
+    # the bounds keep the values of the whole structure
+    def __init__(self, structure: IntermediateStructure, presolve: Presolve = None):
+        self.structure = structure
+        presolve = presolve if presolve is not None else Presolve(structure)
+
+        self.original = {
+            "components" : list(structure.components),
+            "nodes" : list(structure.nodes),
+            "resources" : list(structure.resources)
+        }
+
+        self.removed_components = self.undeployable_components(presolve)
+        self.remove_components()
+
+        self.removed_nodes = self.unusable_nodes(presolve)
+        self.remove_nodes()
+
+        self.removed_resources = self.irrelevant_resources()
+        self.remove_resources()
+
+        if structure.old_deployment is not None:
+            structure.old_deployment = self.restrict_deployment(structure.old_deployment)
+
+        # Integer coded arrays of the pruned structure, for the analyses and
+        # translators that follow
+        self.dense = presolve.dense.restrict(structure)
+
+        # Position in the original dimensions of each position left
+        self.mapping = {
+            kind : [i for i, e in enumerate(self.original[kind]) if e not in removed]
+            for kind, removed in [
+                ("components", self.removed_components),
+                ("nodes", self.removed_nodes),
+                ("resources", self.removed_resources)
+            ]
+        }
+
+    def undeployable_components(self, presolve: Presolve) -> set[str]:
+        # A component which is not a must can only be deployed together with
+        # one of its users: it goes when every user is removed, or is a
+        # flavour that fits no node (its uses are then never in effect).
+        # Components in affinity constraints are kept, since they constrain
+        # the others even when they are not deployed
+        structure = self.structure
+        placeable = {
+            cf : any(row)
+            for cf, row in zip(presolve.dense.compflavs, presolve.rows)
+        }
+
+        users = {c : [] for c in structure.components}
+        for (cs, fs), targets in structure.uses.items():
+            for ct in OrderedDict.fromkeys(ct for ct, _ in targets):
+                if ct != cs:
+                    users[ct].append((cs, fs))
+
+        kept = set(structure.must_components)
+        for kind in ("affinity", "antiaffinity"):
+            for (c1, _), targets in structure.constraints[kind].items():
+                kept.add(c1)
+                kept.update(c2 for c2, _ in targets)
+
+        deployable = set(structure.components)
+        changed = True
+        while changed:
+            changed = False
+            for c in structure.components:
+                if c not in deployable or c in kept:
+                    continue
+
+                if not any(cs in deployable and placeable[(cs, fs)] for cs, fs in users[c]):
+                    deployable.discard(c)
+                    changed = True
+
+        return set(structure.components) - deployable
+
+    def unusable_nodes(self, presolve: Presolve) -> set[str]:
+        rows = [
+            row
+            for (c, _), row in zip(presolve.dense.compflavs, presolve.rows)
+            if c not in self.removed_components
+        ]
+        return {
+            n
+            for j, n in enumerate(presolve.dense.nodes0)
+            if n in self.structure.node_carb and not any(row[j] for row in rows)
+        }
+
+    def irrelevant_resources(self) -> set[str]:
+        # Resources with no component requirement, nor a dependency one that
+        # differs from the default
+        required = {r for _, _, r in self.structure.component_requirements}
+        required.update(r for (_, _, _, r), _ in self.structure.dependency_tensor().items())
+        return {r for r in self.structure.resources if r not in required}
+
+    def remove_components(self):
+        structure = self.structure
+        removed = self.removed_components
+        if len(removed) == 0:
+            return
+
+        structure.components = [c for c in structure.components if c not in removed]
+        structure.flavours = OrderedDict(
+            (c, fs) for c, fs in structure.flavours.items() if c not in removed
+        )
+        flavs = {f for fs in structure.flavours.values() for f in fs}
+        structure.flavs = [f for f in structure.flavs if f in flavs]
+
+        for name in ("importance", "energy", "component_requirements"):
+            setattr(structure, name, OrderedDict(
+                (k, v) for k, v in getattr(structure, name).items() if k[0] not in removed
+            ))
+        for name in ("energy_dependencies", "dependencies"):
+            setattr(structure, name, OrderedDict(
+                (k, v) for k, v in getattr(structure, name).items()
+                if k[0] not in removed and k[2] not in removed
+            ))
+
+        # The flavours left using a removed component fit no node anyway
+        uses = OrderedDict()
+        for (c, f), targets in structure.uses.items():
+            if c not in removed:
+                targets = [(ct, ft) for ct, ft in targets if ct not in removed]
+                if len(targets) > 0:
+                    uses[(c, f)] = targets
+        structure.uses = uses
+
+        structure.constraints["avoid"] = {
+            k : v for k, v in structure.constraints["avoid"].items() if k[0] not in removed
+        }
+
+    def remove_nodes(self):
+        structure = self.structure
+        removed = self.removed_nodes
+        if len(removed) == 0:
+            return
+
+        structure.nodes = [n for n in structure.nodes if n not in removed]
+        for name in (
+            "node_capabilities",
+            "node_cost",
+            "node_carb",
+            "node_profile_cost",
+            "node_profile_key"
+        ):
+            setattr(structure, name, OrderedDict(
+                (k, v) for k, v in getattr(structure, name).items()
+                if (k[0] if isinstance(k, tuple) else k) not in removed
+            ))
+        structure.link_capacity = OrderedDict(
+            (k, v) for k, v in structure.link_capacity.items()
+            if k[0] not in removed and k[1] not in removed
+        )
+        structure.neighbours = None
+
+        avoid = {}
+        for k, nodes in structure.constraints["avoid"].items():
+            nodes = [n for n in nodes if n not in removed]
+            if len(nodes) > 0:
+                avoid[k] = nodes
+        structure.constraints["avoid"] = avoid
+
+    def remove_resources(self):
+        structure = self.structure
+        removed = self.removed_resources
+        if len(removed) == 0:
+            return
+
+        structure.consumable_resource = [r for r in structure.consumable_resource if r not in removed]
+        structure.non_consumable_resource = [r for r in structure.non_consumable_resource if r not in removed]
+        structure.resources = structure.consumable_resource + structure.non_consumable_resource
+        for name in ("node_capabilities", "node_cost", "link_capacity", "dependencies"):
+            setattr(structure, name, OrderedDict(
+                (k, v) for k, v in getattr(structure, name).items() if k[-1] not in removed
+            ))
+
+    def restrict_deployment(self, deployment: dict[tuple[str, str], str]) -> OrderedDict:
+        # A deployment given with the original names, without the placements
+        # on removed components or nodes: they are worth zero in the objective
+        return OrderedDict(
+            ((c, f), n) for (c, f), n in deployment.items()
+            if c not in self.removed_components and n not in self.removed_nodes
+        )
+
+    def report(self) -> str:
+        result = []
+        for kind, removed in [
+            ("components", self.removed_components),
+            ("nodes", self.removed_nodes),
+            ("resources", self.removed_resources)
+        ]:
+            names = [e for e in self.original[kind] if e in removed]
+            result.append(
+                f"Pruned {len(names)} of {len(self.original[kind])} {kind}"
+                + (": " + ", ".join(names) if len(names) > 0 else "")
+            )
+        return "\n".join(result)
@@ -0,0 +1,273 @@
+import json
+import os
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from src.data.resources import Resource, ListResource
+from src.language.intermediate_language import IntermediateStructure, Bounds, ResourceBounds
+
+# Bump whenever the layout changes, saved structures are then rejected
+FORMAT_VERSION = 1
+
+SYMBOLS_FILE = "structure.json"
+
+# Dictionaries keyed by names, saved as a matrix of symbol ids plus a value
+# array. node_carb is the only one keyed by a single name
+KEYED = [
+    "importance",
+    "energy",
+    "energy_dependencies",
+    "component_requirements",
+    "dependencies",
+    "node_capabilities",
+    "node_cost",
+    "node_carb",
+    "link_capacity"
+]
+
+class SymbolTable:
+    def __init__(self, symbols: list[str] = None):
+        self.symbols = symbols if symbols is not None else []
+        self.ids = {s : i for i, s in enumerate(self.symbols)}
+
+    def id(self, symbol: str) -> int:
+        if symbol not in self.ids:
+            self.ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return self.ids[symbol]
+
+def encode_values(values: list) -> dict[str, np.ndarray]:
+    # Integers stay integers and missing values stay None: both are recorded
+    # in a mask when the values are not all integers
+    if all(isinstance(v, int) for v in values):
+        return {"values" : np.array(values, dtype=np.int64)}
+
+    result = {
+        "values" : np.array(
+            [np.nan if v is None else v for v in values],
+            dtype=np.float64
+        ),
+        "integer" : np.array([isinstance(v, int) for v in values], dtype=bool)
+    }
+    missing = np.array([v is None for v in values], dtype=bool)
+    if missing.any():
+        result["missing"] = missing
+    return result
+
+def decode_values(arrays: dict[str, np.ndarray]) -> list:
+    values = arrays["values"].tolist()
+    if "integer" not in arrays:
+        return values
+
+    integer = arrays["integer"]
+    missing = arrays.get("missing")
+    for i in np.flatnonzero(integer).tolist():
+        values[i] = int(values[i])
+    if missing is not None:
+        for i in np.flatnonzero(missing).tolist():
+            values[i] = None
+    return values
+
+def save_arrays(path: str, name: str, arrays: dict[str, np.ndarray]) -> list[str]:
+    for kind, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.{kind}.npy"), array)
+    return list(arrays.keys())
+
+def load_arrays(path: str, name: str, kinds: list[str]) -> dict[str, np.ndarray]:
+    # Read in full: the arrays are turned into dictionaries right away
+    return {
+        kind : np.load(os.path.join(path, f"{name}.{kind}.npy"))
+        for kind in kinds
+    }
+
+def save_counter(path: str, name: str, counter: Counter) -> list[str]:
+    arrays = encode_values(list(counter.keys()))
+    arrays["counts"] = np.array(list(counter.values()), dtype=np.int64)
+    return save_arrays(path, name, arrays)
+
+def load_counter(path: str, name: str, kinds: list[str]) -> Counter:
+    arrays = load_arrays(path, name, kinds)
+    return Counter(dict(zip(decode_values(arrays), arrays["counts"].tolist())))
+
+def load_bounds(path: str, name: str, kinds: list[str]) -> Bounds:
+    return Bounds.of(load_counter(path, name, kinds))
+
+def resource_definition(r: Resource) -> dict:
+    result = {
+        "name" : r.name,
+        "consumable" : r.consumable,
+        "minimization" : r.minimization,
+        "best_bound" : r.best_bound,
+        "worst_bound" : r.worst_bound
+    }
+    if isinstance(r, ListResource):
+        result["choices"] = list(r.choices)
+    return result
+
+def resource_from_definition(data: dict) -> Resource:
+    if "choices" in data:
+        return ListResource(data["name"], data["minimization"], data["choices"])
+    return Resource(
+        data["name"],
+        data["consumable"],
+        data["minimization"],
+        data["best_bound"],
+        data["worst_bound"]
+    )
+
+def save_structure(structure: IntermediateStructure, path: str):
+    os.makedirs(path, exist_ok=True)
+    symbols = SymbolTable()
+
+    keyed = {}
+    for name in KEYED:
+        values = getattr(structure, name)
+        keys = [k if isinstance(k, tuple) else (k,) for k in values.keys()]
+        ids = np.array(
+            [[symbols.id(s) for s in k] for k in keys],
+            dtype=np.int32
+        ).reshape(len(keys), len(keys[0]) if len(keys) > 0 else 0)
+
+        arrays = encode_values(list(values.values()))
+        arrays["keys"] = ids
+        keyed[name] = save_arrays(path, name, arrays)
+
+    catalog = OrderedDict((r.name, r) for r in structure.bounded_resources.values())
+
+    resource_bounds = OrderedDict()
+    for i, r_name in enumerate(structure.resource_bounds.best):
+        resource_bounds[r_name] = {
+            "best" : structure.resource_bounds.best[r_name],
+            "worst" : structure.resource_bounds.worst[r_name],
+            "values" : save_counter(
+                path,
+                f"resource_bounds.{i}",
+                structure.resource_bounds.values[r_name].values
+            )
+        }
+
+    data = {
+        "version" : FORMAT_VERSION,
+        "keyed" : keyed,
+        "app_name" : structure.app_name,
+        "infrastructure_name" : structure.infrastructure_name,
+        "cost_budget" : structure.cost_budget,
+        "carbon_budget" : structure.carbon_budget,
+        "components" : structure.components,
+        "must_components" : structure.must_components,
+        "flavours" : structure.flavours,
+        "flavs" : structure.flavs,
+        "uses" : [[list(k), [list(u) for u in v]] for k, v in structure.uses.items()],
+        "nodes" : structure.nodes,
+        "consumable_resource" : structure.consumable_resource,
+        "non_consumable_resource" : structure.non_consumable_resource,
+        "resources" : structure.resources,
+        "resource_minimization" : structure.resource_minimization,
+        "worst_bounds" : structure.worst_bounds,
+        "best_bounds" : structure.best_bounds,
+        "max_bound" : structure.max_bound,
+        "min_bound" : structure.min_bound,
+        "bounds" : save_counter(path, "bounds", structure.bounds.values),
+        "catalog" : [resource_definition(r) for r in catalog.values()],
+        "bounded_resources" : {n : r.name for n, r in structure.bounded_resources.items()},
+        "resource_references" : structure.resource_references,
+        "resource_bounds" : resource_bounds,
+        "node_profile_cost" : structure.node_profile_cost,
+        "node_profile_key" : {
+            n : k[1] if k is not None else None
+            for n, k in structure.node_profile_key.items()
+        },
+        "old_deployment" : [
+            [c, f, n] for (c, f), n in structure.old_deployment.items()
+        ] if structure.old_deployment is not None else None,
+        "constraints" : {
+            kind : [[list(k), v] for k, v in values.items()]
+            for kind, values in structure.constraints.items()
+        },
+        "symbols" : symbols.symbols
+    }
+
+    with open(os.path.join(path, SYMBOLS_FILE), "w") as f:
+        json.dump(data, f)
+
+def load_structure(path: str) -> IntermediateStructure:
+    with open(os.path.join(path, SYMBOLS_FILE), "r") as f:
+        data = json.load(f)
+
+    if data["version"] != FORMAT_VERSION:
+        raise AssertionError(f"Unsupported intermediate structure version {data['version']} in {path}")
+
+    symbols = np.array(data["symbols"], dtype=object)
+
+    # Bypass __init__: everything it computes is read back instead
+    structure = IntermediateStructure.__new__(IntermediateStructure)
+
+    for name, kinds in data["keyed"].items():
+        arrays = load_arrays(path, name, kinds)
+        columns = [symbols[c].tolist() for c in arrays["keys"].T]
+        keys = columns[0] if len(columns) == 1 else zip(*columns)
+        setattr(structure, name, OrderedDict(zip(keys, decode_values(arrays))))
+
+    structure.app_name = data["app_name"]
+    structure.infrastructure_name = data["infrastructure_name"]
+    structure.cost_budget = data["cost_budget"]
+    structure.carbon_budget = data["carbon_budget"]
+    structure.components = data["components"]
+    structure.must_components = data["must_components"]
+    structure.flavours = OrderedDict(data["flavours"])
+    structure.flavs = data["flavs"]
+    structure.uses = OrderedDict(
+        (tuple(k), [tuple(u) for u in v])
+        for k, v in data["uses"]
+    )
+    structure.nodes = data["nodes"]
+    structure.consumable_resource = data["consumable_resource"]
+    structure.non_consumable_resource = data["non_consumable_resource"]
+    structure.resources = data["resources"]
+    structure.list_resource = OrderedDict()
+    structure.resource_minimization = OrderedDict(data["resource_minimization"])
+    structure.worst_bounds = OrderedDict(data["worst_bounds"])
+    structure.best_bounds = OrderedDict(data["best_bounds"])
+    structure.max_bound = data["max_bound"]
+    structure.min_bound = data["min_bound"]
+    structure.bounds = load_bounds(path, "bounds", data["bounds"])
+
+    catalog = {
+        r["name"] : resource_from_definition(r)
+        for r in data["catalog"]
+    }
+    structure.bounded_resources = OrderedDict(
+        (n, catalog[r_name])
+        for n, r_name in data["bounded_resources"].items()
+    )
+    structure.resource_references = Counter(data["resource_references"])
+    structure.resource_bounds = ResourceBounds()
+    for i, (r_name, bounds) in enumerate(data["resource_bounds"].items()):
+        structure.resource_bounds.best[r_name] = bounds["best"]
+        structure.resource_bounds.worst[r_name] = bounds["worst"]
+        structure.resource_bounds.values[r_name] = load_bounds(
+            path,
+            f"resource_bounds.{i}",
+            bounds["values"]
+        )
+
+    structure.node_profile_cost = OrderedDict(data["node_profile_cost"])
+    structure.node_profile_key = OrderedDict(
+        (n, (n, r) if r is not None else None)
+        for n, r in data["node_profile_key"].items()
+    )
+    structure.neighbours = None
+
+    structure.old_deployment = OrderedDict(
+        ((c, f), n) for c, f, n in data["old_deployment"]
+    ) if data["old_deployment"] is not None else None
+    structure.constraints = {
+        kind : {
+            tuple(k) : [tuple(e) if isinstance(e, list) else e for e in v]
+            for k, v in values
+        }
+        for kind, values in data["constraints"].items()
+    }
+
+    return structure
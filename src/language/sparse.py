@@ -0,0 +1,104 @@
+from typing import Iterator
+
+import numpy as np
+
+def value_type(*values) -> type:
+    # Keep integers as integers, so that they are printed without decimals
+    for vs in values:
+        for v in vs:
+            if not isinstance(v, (int, np.integer)):
+                return np.float64
+    return np.int64
+
+def integer_mask(values) -> np.ndarray:
+    # Values given as integers, printed back without decimals even when a
+    # float elsewhere makes their whole array float
+    return np.array([isinstance(v, (int, np.integer)) for v in values], dtype=bool)
+
+def python_values(values: np.ndarray, integer: np.ndarray) -> np.ndarray:
+    # Integer arrays as they are, float ones as objects with the cells given
+    # as integers back to int
+    if values.dtype.kind != "f":
+        return values
+    result = values.astype(object)
+    result[integer] = values[integer].astype(np.int64).astype(object)
+    return result
+
+class SparseTensor:
+    # Coordinate (COO) tensor whose last axis is the resource one: every cell
+    # that is not stored holds the default value of its resource. Entries are
+    # kept sorted in row-major order, like the dense arrays are emitted
+    def __init__(
+        self,
+        axes: list[list[str]],
+        coords: np.ndarray,
+        values: np.ndarray,
+        default: np.ndarray,
+        integer: np.ndarray = None,
+        default_integer: np.ndarray = None
+    ):
+        self.axes = axes
+        self.shape = tuple(len(a) for a in axes)
+        self.default = default
+
+        # Without masks, the values are integers only in integer arrays
+        if integer is None:
+            integer = np.full(len(values), values.dtype.kind != "f")
+        if default_integer is None:
+            default_integer = np.full(len(default), default.dtype.kind != "f")
+        self.default_integer = default_integer
+
+        order = np.lexsort(coords.T[::-1]) if len(coords) > 0 else np.arange(0)
+        self.coords = coords[order]
+        self.values = values[order]
+        self.integer = integer[order]
+
+    @classmethod
+    def from_dict(cls, values: dict[tuple, int], axes: list[list[str]], default: list):
+        indexes = [{e : i for i, e in enumerate(a)} for a in axes]
+
+        coords = np.array(
+            [[idx[k] for idx, k in zip(indexes, key)] for key in values.keys()],
+            dtype=np.intp
+        ).reshape(len(values), len(axes))
+        default_integer = integer_mask(default)
+        default = np.array(default, dtype=value_type(default))
+        integer = integer_mask(values.values())
+        values = np.array(
+            list(values.values()),
+            dtype=value_type(values.values(), default)
+        )
+        return cls(axes, coords, values, default, integer, default_integer)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.values)
+
+    def explicit(self) -> np.ndarray:
+        # Mask of the stored entries that differ from their default
+        return self.values != self.default[self.coords[:, -1]]
+
+    def entries(self) -> Iterator[tuple[tuple[int, ...], int]]:
+        # Non-default entries as (index tuple, value), in row-major order
+        mask = self.explicit()
+        values = python_values(self.values[mask], self.integer[mask])
+        for idx, v in zip(self.coords[mask].tolist(), values.tolist()):
+            yield tuple(idx), v
+
+    def items(self) -> Iterator[tuple[tuple[str, ...], int]]:
+        # Like entries, with names instead of indexes
+        for idx, v in self.entries():
+            yield tuple(a[i] for a, i in zip(self.axes, idx)), v
+
+    def to_dense(self) -> np.ndarray:
+        result = np.empty(self.shape, dtype=np.result_type(self.values, self.default))
+        result[...] = self.default
+        result[tuple(self.coords.T)] = self.values
+        return result
+
+    def to_dense_integer(self) -> np.ndarray:
+        # Mask of the cells of to_dense given as integers
+        result = np.empty(self.shape, dtype=bool)
+        result[...] = self.default_integer
+        result[tuple(self.coords.T)] = self.integer
+        return result
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from src.language.intermediate_language import IntermediateStructure
+from src.language.dense import DenseStructure
+
+class NodeSymmetry:
+    # Classes of interchangeable nodes: swapping any two nodes of a class maps
+    # every node indexed array of the models (capabilities, costs, carbon,
+    # links and second phase inputs) onto itself, so the solutions come in
+    # permutations of the class
+    def __init__(self, structure: IntermediateStructure, dense: DenseStructure = None):
+        self.structure = structure
+        self.dense = dense if dense is not None else DenseStructure(structure)
+
+        # Same id for equal link capability vectors, compared as raw bytes
+        # which is much faster than np.unique over rows
+        dense = self.dense
+        n = len(dense.nodes0)
+        if len(dense.resources) > 0:
+            links = np.ascontiguousarray(dense.linkCap.reshape(n * n, len(dense.resources)))
+            rows = links.view(np.dtype((np.void, links.itemsize * links.shape[1]))).ravel()
+            self.link_ids = np.unique(rows, return_inverse=True)[1].reshape(n, n)
+        else:
+            self.link_ids = np.zeros((n, n), dtype=np.intp)
+
+        self.classes = self.find_classes()
+
+    def second_phase(self) -> list[tuple]:
+        # Placements avoided on and previously deployed on each node
+        avoid = {j : [] for j in range(len(self.dense.nodes0))}
+        for cf, nodes in self.structure.constraints["avoid"].items():
+            for node in nodes:
+                avoid[self.dense.node_index[node]].append(cf)
+
+        old = {j : [] for j in range(len(self.dense.nodes0))}
+        if self.structure.old_deployment is not None:
+            for cf, node in self.structure.old_deployment.items():
+                old[self.dense.node_index[node]].append(cf)
+
+        return [
+            (tuple(sorted(avoid[j])), tuple(sorted(old[j])))
+            for j in range(len(self.dense.nodes0))
+        ]
+
+    def signatures(self) -> list[tuple]:
+        # Equal for interchangeable nodes: the node arrays as they are, and
+        # the links towards the others as a sorted profile
+        dense = self.dense
+        profiles = self.link_ids.copy()
+        np.fill_diagonal(profiles, -1)
+        profiles.sort(axis=1)
+
+        second_phase = self.second_phase()
+        return [
+            (
+                dense.nodeCap[j].tobytes(),
+                dense.nodeCap_explicit[j].tobytes(),
+                dense.cost[j].tobytes(),
+                dense.cost_explicit[j].tobytes(),
+                dense.carb[j].item(),
+                self.link_ids[j, j].item(),
+                profiles[j].tobytes(),
+                second_phase[j]
+            )
+            for j in range(len(dense.nodes0))
+        ]
+
+    def interchangeable(self, a: int, b: int) -> bool:
+        # Swapping a and b leaves the links to every other node unchanged
+        ids = self.link_ids
+        others = np.ones(len(ids), dtype=bool)
+        others[[a, b]] = False
+        return (
+            ids[a, a] == ids[b, b]
+            and ids[a, b] == ids[b, a]
+            and np.array_equal(ids[a, others], ids[b, others])
+            and np.array_equal(ids[others, a], ids[others, b])
+        )
+
+    def find_classes(self) -> list[list[str]]:
+        # Nodes with the same signature are only candidates, each one is
+        # checked against the first node of the classes found so far
+        buckets = OrderedDict()
+        for j, signature in enumerate(self.signatures()):
+            if j != 0:
+                buckets.setdefault(signature, []).append(j)
+
+        result = []
+        for candidates in buckets.values():
+            classes = []
+            for j in candidates:
+                for c in classes:
+                    if self.interchangeable(c[0], j):
+                        c.append(j)
+                        break
+                else:
+                    classes.append([j])
+            result.extend(
+                [self.dense.nodes0[j] for j in c]
+                for c in classes
+                if len(c) > 1
+            )
+
+        return result
+
+    def report(self) -> str:
+        return "\n".join(
+            [f"Found {len(self.classes)} classes of interchangeable nodes"] + [
+                f"\t{len(c)} nodes: " + ", ".join(c)
+                for c in self.classes
+            ]
+        )
@@ -0,0 +1,319 @@
+from typing import Iterator
+
+import numpy as np
+
+from src.language.dense import DenseStructure
+from src.language.intermediate_language import IntermediateStructure
+from src.language.presolve import Presolve
+from .utils import construct_dense, construct_array, combine_comp_flav, bound_names
+
+# Data items in order, grouped by output section
+DATA_SECTIONS = [
+    ["Comps"],
+    ["mustComps"],
+    ["Flavs"],
+    ["Flav"],
+    ["imp"],
+    ["energy"],
+    ["energy_dependency"],
+    ["Uses"],
+    ["mayUse"],
+    ["CRes"],
+    ["NRes"],
+    ["MAX_RBOUNDS", "MIN_RBOUNDS", "worstBounds", "bestBounds"],
+    ["comReq"],
+    ["Nodes"],
+    ["nodeCap"],
+    ["depReq"],
+    ["linkCap"],
+    ["cost"],
+    ["carb"],
+    ["costBudget"],
+    ["carbBudget"]
+]
+
+class DataSection:
+    # Input data of the MiniZinc models, shared by the translators of a same
+    # structure: the derived tables are computed once, and each value (what
+    # follows "name = ") is rendered once, whatever the outputs using it
+    def __init__(
+        self,
+        structure: IntermediateStructure,
+        presolve: Presolve = None,
+        sparse: bool = False,
+        dense: DenseStructure = None
+    ):
+        self.structure = structure
+        self.presolve = presolve
+        self.sparse = sparse
+
+        flavs_order = {e : i for i, e in enumerate(self.structure.flavs)}
+
+        self.flavours = {
+            c : sorted(f, key=lambda x: flavs_order.get(x, float('inf')))
+            for c, f in self.structure.flavours.items()
+        }
+
+        self.compflavs = [
+            combine_comp_flav(c, f)
+            for c, fs in self.flavours.items()
+            for f in fs
+        ]
+
+        self.uses = dict()
+        for (c1, f1), uses_list in self.structure.uses.items():
+            for (c2, f2) in uses_list:
+                self.uses[
+                    combine_comp_flav(c1, f1),
+                    combine_comp_flav(c2, f2)
+                ] = str(1)
+
+        self.mayUse = {}
+        for c in self.structure.components:
+            for c_prime in self.structure.components:
+                for f_prime in self.flavours[c_prime]:
+                    is_used = False
+                    for f in self.flavours[c]:
+                        if ((c_prime, f_prime) in self.structure.uses) and ((c, f) in self.structure.uses[(c_prime, f_prime)]):
+                            is_used = True
+
+                    if is_used:
+                        self.mayUse.update({
+                            (c, combine_comp_flav(c_prime, f_prime)): 1
+                        })
+
+        self.renderers = {
+            "Comps" : lambda : "{" + ", ".join(self.structure.components) + "};",
+            "mustComps" : lambda : "{" + ", ".join(self.structure.must_components) + "};",
+            "Flavs" : lambda : "{" + ", ".join(self.structure.flavs) + "};",
+            "Flav" : lambda : "[" + ", ".join(
+                "{" + ", ".join(fs) + "}"
+                for fs in self.flavours.values()
+            ) + "];",
+            "imp" : self.make_importance,
+            "energy" : self.make_energy,
+            "energy_dependency" : self.make_energy_dependency,
+            "Uses" : self.make_uses,
+            "mayUse" : self.make_may_use,
+            "CRes" : lambda : "{" + ", ".join(self.structure.consumable_resource) + "};",
+            "NRes" : lambda : "{" + ", ".join(self.structure.non_consumable_resource) + "};",
+            "MAX_RBOUNDS" : lambda : str(max(self.structure.worst_bounds.values())) + ";\n",
+            "MIN_RBOUNDS" : lambda : str(min(self.structure.best_bounds.values())) + ";\n",
+            "worstBounds" : lambda : self.make_resources_bounds(True),
+            "bestBounds" : lambda : self.make_resources_bounds(False),
+            "comReq" : self.make_component_requirement,
+            "Nodes" : lambda : "{" + ", ".join(self.structure.nodes) + "};\n",
+            "nodeCap" : self.make_node_capabilities,
+            "depReq" : self.make_dependency_requirement,
+            "linkCap" : self.make_link_capacity,
+            "cost" : self.make_cost,
+            "carb" : self.make_carb,
+            "costBudget" : lambda : str(self.structure.cost_budget) + ";",
+            "carbBudget" : lambda : str(self.structure.carbon_budget) + ";",
+            "D" : self.make_placements
+        }
+        self.values = {}
+        self.dense_structure = dense
+
+    @property
+    def dense(self) -> DenseStructure:
+        # Integer coded arrays, built on first use unless given (the presolve
+        # has them)
+        if self.dense_structure is None:
+            if self.presolve is not None:
+                self.dense_structure = self.presolve.dense
+            else:
+                self.dense_structure = DenseStructure(self.structure)
+        return self.dense_structure
+
+    def value(self, name: str) -> str:
+        if name not in self.values:
+            self.values[name] = self.renderers[name]()
+        return self.values[name]
+
+    def sections(self, declarations: dict[str, str]) -> Iterator[str]:
+        # Every data item as "name = value", preceded by its declaration
+        # when given (e.g. its type in a model file)
+        groups = list(DATA_SECTIONS)
+        if self.presolve is not None:
+            groups.append(["D"])
+
+        for names in groups:
+            yield "".join(
+                declarations.get(name, "") + name + " = " + self.value(name)
+                for name in names
+            )
+
+    def make_importance(self):
+        return "array2d(Comps, Flavs, [\n" + construct_dense(
+            self.structure.importance,
+            [
+                (self.structure.components, "Comps"),
+                (self.structure.flavs, "Flavs")
+            ],
+            "0"
+        )
+
+    def make_energy(self):
+        compflavs_energy = {
+            combine_comp_flav(c, f) : v
+            for (c, f), v in self.structure.energy.items()
+        }
+
+        return "[" + ", ".join(str(compflavs_energy[cf]) for cf in self.compflavs) + "];"
+
+    def make_energy_dependency(self):
+        return construct_array(
+            "array3d(Comps, Flavs, Comps, [",
+            self.structure.energy_dependencies,
+            [
+                (self.structure.components, "Comps"),
+                (self.structure.flavs, "Flavs"),
+                (self.structure.components, "Comps")
+            ],
+            "0",
+            self.sparse,
+            "\n"
+        )
+
+    def make_uses(self):
+        return construct_array(
+            "array2d(CompFlavs, CompFlavs, [",
+            self.uses,
+            [
+                (self.compflavs, "CompFlavs"),
+                (self.compflavs, "CompFlavs")
+            ],
+            "0",
+            self.sparse,
+            "\n"
+        )
+
+    def make_may_use(self):
+        return construct_array(
+            "array2d(Comps, CompFlavs, [",
+            self.mayUse,
+            [
+                (self.structure.components, "Comps"),
+                (self.compflavs, "CompFlavs")
+            ],
+            "0",
+            self.sparse,
+            "\n"
+        )
+
+    def make_resources_bounds(self, worst: bool):
+        return "[\n" + "".join(
+            "\t" + name + ", % " + r + "\n"
+            for r, name in zip(self.structure.resources, bound_names(self.structure, worst))
+        ) + "];\n"
+
+    def make_component_requirement(self):
+        compflavs_comreq = {
+            (combine_comp_flav(c, f), r) : v
+            for (c, f, r), v in self.structure.component_requirements.items()
+        }
+
+        return "array2d(CompFlavs, Res, [\n" + construct_dense(
+            compflavs_comreq,
+            [
+                (self.compflavs, "CompFlavs"),
+                (self.structure.resources, "Res")
+            ],
+            bound_names(self.structure)
+        )
+
+    def make_node_capabilities(self):
+        return (
+            "array2d(Nodes0, Res,\n"
+            + "\t[bestBounds[r] | r in Res] ++ [ % No node\n"
+            + construct_dense(
+                self.structure.node_capabilities,
+                [
+                    (self.structure.nodes, "Nodes"),
+                    (self.structure.resources, "Res")
+                ],
+                "0"
+            )
+        )
+
+    def make_dependency_requirement(self):
+        return construct_array(
+            "array4d(Comps, Flavs, Comps, Res, [\n",
+            self.structure.dependencies,
+            [
+                (self.structure.components, "Comps"),
+                (self.structure.flavs, "Flavs"),
+                (self.structure.components, "Comps"),
+                (self.structure.resources, "Res")
+            ],
+            bound_names(self.structure),
+            self.sparse
+        )
+
+    def make_link_capacity(self):
+        # A node reaches itself with its own capabilities: fill them in a copy,
+        # so that the structure can be translated again
+        link_capacity = self.structure.link_capacity.copy()
+        for n in self.structure.nodes:
+            for r in self.structure.resources:
+                if (n, n, r) not in link_capacity:
+                    if (n, r) in self.structure.node_capabilities:
+                        link_capacity[(n, n, r)] = self.structure.node_capabilities[(n, r)]
+                    else:
+                        link_capacity[(n, n, r)] = '0'
+
+        # Missing links are at the worst bound, the ones towards the "no
+        # node" at the best one
+        nodes0 = len(self.structure.nodes) + 1
+        bounds = np.empty((nodes0, nodes0, len(self.structure.resources)), dtype=object)
+        bounds[...] = bound_names(self.structure)
+        bounds[0, :] = bound_names(self.structure, worst=False)
+        bounds[:, 0] = bound_names(self.structure, worst=False)
+
+        return construct_array(
+            "array3d(Nodes0, Nodes0, Res, [\n",
+            link_capacity,
+            [
+                (["0"] + self.structure.nodes, "Nodes0"),
+                (["0"] + self.structure.nodes, "Nodes0"),
+                (self.structure.resources, "Res")
+            ],
+            bounds,
+            self.sparse
+        )
+
+    def make_cost(self):
+        return "array2d(Nodes0, Res, [0 | r in Res] ++ [ % No node\n" + construct_dense(
+            self.structure.node_cost,
+            [
+                (self.structure.nodes, "Nodes"),
+                (self.structure.resources, "Res")
+            ],
+            "0"
+        )
+
+    def make_carb(self):
+        return (
+            "array1d(Nodes0, [0] ++ [ % No node\n\t"
+            + ", ".join(str(self.structure.node_carb[n]) for n in self.structure.nodes)
+            + "\n]);"
+        )
+
+    def make_placements(self):
+        # Infeasible placements are fixed to zero, the others are left free
+        placements = {
+            (combine_comp_flav(c, f), n) : "_"
+            for (c, f), row in zip(self.presolve.dense.compflavs, self.presolve.rows)
+            for n, feasible in zip(self.presolve.dense.nodes0, row)
+            if feasible
+        }
+
+        return "array2d({0} union CompFlavs, Nodes0, [\n" + construct_dense(
+            placements,
+            [
+                (["0"] + self.compflavs, "CompFlavs"),
+                (["0"] + self.structure.nodes, "Nodes0")
+            ],
+            "0"
+        )
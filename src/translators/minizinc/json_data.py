@@ -0,0 +1,167 @@
+import json
+from typing import Any, Iterator
+
+import numpy as np
+
+from src.language.intermediate_language import IntermediateStructure
+from src.language.presolve import Presolve
+from src.language.sparse import python_values, value_type
+from src.translators.translator import Translator
+from .data import DataSection, DATA_SECTIONS
+from .utils import combine_comp_flav
+
+# NumPy arrays are serialized natively by orjson, and as nested lists otherwise
+# (always for object arrays, mixing integers and floats)
+try:
+    import orjson
+
+    def serialize_value(value: Any) -> str:
+        if isinstance(value, np.ndarray) and value.dtype == object:
+            value = value.tolist()
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    def serialize_value(value: Any) -> str:
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        return json.dumps(value, separators=(",", ":"))
+
+def enum_values(names: list[str]) -> list[dict[str, str]]:
+    # Enum definitions and values are objects with the "e" key
+    return [{"e" : n} for n in names]
+
+def enum_set(names: list[str]) -> dict[str, list]:
+    return {"set" : enum_values(names)}
+
+def table(values: dict[tuple, Any], axes: list[list[str]], default: int = 0) -> np.ndarray:
+    # Array over the axes, keys outside them are ignored. Cells given as
+    # floats stay floats, like in the dzn output
+    indexes = [{e : i for i, e in enumerate(a)} for a in axes]
+    shape = tuple(len(a) for a in axes)
+    result = np.full(shape, default, dtype=value_type(values.values()))
+    integer = np.full(shape, True, dtype=bool)
+    for key, v in values.items():
+        idx = tuple(index.get(k) for index, k in zip(indexes, key))
+        if None not in idx:
+            result[idx] = v
+            integer[idx] = isinstance(v, (int, np.integer))
+    return python_values(result, integer)
+
+class JSONTranslator(Translator):
+    # Same data as the dzn output, in the JSON format MiniZinc also reads.
+    # Every array comes from the integer coded structure, so bounds are
+    # written as numbers instead of MIN_RBOUNDS and MAX_RBOUNDS
+    def __init__(
+        self,
+        structure: IntermediateStructure,
+        presolve: Presolve = None,
+        data: DataSection = None
+    ):
+        super(JSONTranslator, self).__init__(structure)
+        self.presolve = presolve
+        self.data = data if data is not None else DataSection(structure, presolve)
+
+        self.flavours = self.data.flavours
+        self.compflavs = self.data.compflavs
+
+        self.renderers = {
+            "Comps" : lambda : enum_values(self.structure.components),
+            "mustComps" : lambda : enum_set(self.structure.must_components),
+            "Flavs" : lambda : enum_values(self.structure.flavs),
+            "Flav" : lambda : [enum_set(fs) for fs in self.flavours.values()],
+            "imp" : lambda : self.dense_values("importance"),
+            "energy" : self.make_energy,
+            "energy_dependency" : lambda : table(
+                self.structure.energy_dependencies,
+                [self.structure.components, self.structure.flavs, self.structure.components]
+            ),
+            "Uses" : lambda : table(self.data.uses, [self.compflavs, self.compflavs]),
+            "mayUse" : lambda : table(self.data.mayUse, [self.structure.components, self.compflavs]),
+            "CRes" : lambda : enum_values(self.structure.consumable_resource),
+            "NRes" : lambda : enum_values(self.structure.non_consumable_resource),
+            "MAX_RBOUNDS" : lambda : max(self.structure.worst_bounds.values()),
+            "MIN_RBOUNDS" : lambda : min(self.structure.best_bounds.values()),
+            "worstBounds" : lambda : self.dense_values("worst"),
+            "bestBounds" : lambda : self.dense_values("best"),
+            "comReq" : lambda : self.dense_values("comReq"),
+            "Nodes" : lambda : enum_values(self.structure.nodes),
+            "nodeCap" : lambda : self.dense_values("nodeCap"),
+            "depReq" : self.make_dependency_requirement,
+            "linkCap" : lambda : self.dense_values("linkCap"),
+            "cost" : lambda : self.dense_values("cost"),
+            "carb" : lambda : self.dense_values("carb"),
+            "costBudget" : lambda : self.structure.cost_budget,
+            "carbBudget" : lambda : self.structure.carbon_budget
+        }
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        # The presolved D is left out: JSON cannot leave some of its cells free
+        for names in DATA_SECTIONS:
+            for name in names:
+                yield name, self.renderers[name]()
+
+    def sections(self):
+        # One item per line, the whole object is never held in memory
+        yield "{"
+        previous = None
+        for name, value in self.items():
+            if previous is not None:
+                yield previous + ","
+            previous = "\"" + name + "\": " + serialize_value(value)
+
+        if previous is not None:
+            yield previous
+        yield "}"
+
+    def dense_values(self, name: str) -> np.ndarray:
+        # Cells given as integers stay integers in float arrays
+        dense = self.data.dense
+        return python_values(getattr(dense, name), getattr(dense, name + "_integer"))
+
+    def make_dependency_requirement(self):
+        tensor = self.structure.dependency_tensor()
+        return python_values(tensor.to_dense(), tensor.to_dense_integer())
+
+    def make_energy(self):
+        compflavs_energy = {
+            combine_comp_flav(c, f) : v
+            for (c, f), v in self.structure.energy.items()
+        }
+        return [compflavs_energy[cf] for cf in self.compflavs]
+
+
+class JSONSecondPhaseTranslator(JSONTranslator):
+    # Also writes the old deployment and the constraints, as 0/1 tables
+    # the model reads instead of generated constraints:
+    #   array[CompFlavs, Nodes] of 0..1: D_old;
+    #   array[CompFlavs, Nodes] of 0..1: avoid;
+    #   array[CompFlavs, CompFlavs] of 0..1: affinity;
+    #   array[CompFlavs, CompFlavs] of 0..1: antiaffinity;
+    def items(self):
+        yield from super().items()
+
+        yield "D_old", table(
+            {
+                (combine_comp_flav(c, f), n) : 1
+                for (c, f), n in self.structure.old_deployment.items()
+            },
+            [self.compflavs, self.structure.nodes]
+        )
+
+        yield "avoid", table(
+            {
+                (combine_comp_flav(c, f), n) : 1
+                for (c, f), nodes in self.structure.constraints["avoid"].items()
+                for n in nodes
+            },
+            [self.compflavs, self.structure.nodes]
+        )
+
+        for kind in ("affinity", "antiaffinity"):
+            yield kind, table(
+                {
+                    (combine_comp_flav(c1, f1), combine_comp_flav(c2, f2)) : 1
+                    for (c1, f1), targets in self.structure.constraints[kind].items()
+                    for c2, f2 in targets
+                },
+                [self.compflavs, self.compflavs]
+            )
@@ -1,7 +1,14 @@
-from itertools import product
+from itertools import chain, product
+from typing import Iterator
+
+import numpy as np
 
 from src.language.intermediate_language import IntermediateStructure
+from src.language.presolve import Presolve
+from src.language.symmetry import NodeSymmetry
+from src.language.sparse import SparseTensor, python_values
 from src.translators.translator import Translator
+from .data import DataSection
 from .utils import combine_comp_flav
 
 model_output = """
@@ -30,21 +37,40 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
     def make_d_cf(self, cf, j) -> str:
        return "D[" + str(cf) + ", " + j + "]"
 
-    def __init__(self, struct: IntermediateStructure):
+    def placed(self, c, i, j) -> bool:
+        # Placements fixed to zero by the presolve are left out of the sums
+        return self.presolve is None or self.presolve.is_feasible(c, i, j)
+
+    def make_sum(self, terms: list[str], separator: str = "\n\t+ ") -> str:
+        return separator.join(terms) if len(terms) > 0 else "0"
+
+    def stream_sum(self, head: str, terms: Iterator[str], tail: str) -> Iterator[str]:
+        # Same text as head + make_sum(terms) + tail, one section per term
+        previous = None
+        for term in terms:
+            if previous is not None:
+                yield previous
+                previous = "\t+ " + term
+            else:
+                previous = head + term
+        yield (previous if previous is not None else head + "0") + tail
+
+    def __init__(
+        self,
+        struct: IntermediateStructure,
+        presolve: Presolve = None,
+        symmetry: NodeSymmetry = None,
+        data: DataSection = None
+    ):
         super(MZNUnrollTranslator, self).__init__(struct)
+        self.presolve = presolve
+        self.symmetry = symmetry
+        self.data = data if data is not None else DataSection(struct, presolve)
 
-        flavs_order = {e : i for i, e in enumerate(self.structure.flavs)}
-
-        self.flavours = {
-            c : sorted(f, key=lambda x: flavs_order.get(x, float('inf')))
-            for c, f in self.structure.flavours.items()
-        }
+        self.flavours = self.data.flavours
+        self.compflavs = self.data.compflavs
 
-        self.compflavs = [
-            combine_comp_flav(c, f)
-            for c, fs in self.flavours.items()
-            for f in fs
-        ]
+        self.dense = self.data.dense
 
         self.zero_node = "0"
         self.nodes0 = [self.zero_node] + self.structure.nodes
@@ -56,103 +82,80 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
             for r in self.structure.resources
         }
 
-        self.mayUse = {}
-        for c in self.structure.components:
-            for c_prime in self.structure.components:
-                for f_prime in self.flavours[c_prime]:
-                    is_used = False
-                    for f in self.flavours[c]:
-                        if ((c_prime, f_prime) in self.structure.uses) and ((c, f) in self.structure.uses[(c_prime, f_prime)]):
-                            is_used = True
-
-                    if is_used:
-                        self.mayUse.update({
-                            (c, combine_comp_flav(c_prime, f_prime)): 1
-                        })
+        self.mayUse = self.data.mayUse
 
-        self.output = []
-
-    def translate(self):
+    def sections(self):
         preamble = "%%% MZN optimized for " + self.structure.app_name + " in " + self.structure.infrastructure_name + " %%%"
-        self.output.extend([
+        yield from [
             "%" * len(preamble),
             preamble,
             "%" * len(preamble),
             ""
-        ])
-
-        self.output.append("enum Comps = {" + ", ".join(self.structure.components) + "};")
-        self.output.append("set of Comps: mustComps = {" + ", ".join(self.structure.must_components) + "};")
-
-        self.output.append("enum Flavs = {" + ", ".join(self.structure.flavs) + "};")
-        self.output.append("array[Comps] of set of Flavs: Flav = [" + ", ".join(
-            "{" + ", ".join(fs) + "}"
-            for fs in self.flavours.values()
-        ) + "];")
-
-        self.output.append("enum CompFlavs = {" + ", ".join(self.compflavs) + "};")
-        self.output.append("enum CRes = {" + ", ".join(self.structure.consumable_resource) + "};")
-        self.output.append("enum NRes = {" + ", ".join(self.structure.non_consumable_resource) + "};")
-        self.output.append("enum Nodes = {" + ", ".join(self.structure.nodes) + "};")
-        self.output.append("set of int: Nodes0 = {" + self.zero_node + "} union Nodes;\n")
-
-        self.output.append("array [{0} union CompFlavs, Nodes0] of var 0..1: D;")
-        self.output.append(model_output)
-        self.output.append("var int: totCost = " + self.tot_cost() + ";")
-        self.output.append("var int: totCarb = " + self.tot_carb() + ";")
-        self.output.append(self.make_obj())
-        self.output.append("solve maximize obj;")
-
-        self.constraints = []
-        self.constraints.append("totCost <= " + str(self.structure.cost_budget))
-        self.constraints.append("totCarb <= " + str(self.structure.carbon_budget))
-        self.constraints.extend(self.zero_values())
-        self.constraints.extend(self.at_most_one())
-        self.constraints.extend(self.must_deploy())
-        self.constraints.extend(self.bigger_or_equal())
-        self.constraints.extend(self.target_not_in_mustcomps())
-        self.constraints.extend(self.sufficient_quantity())
-        self.constraints.extend(self.certain_amount())
-        self.constraints.extend(self.non_consumable_dependency())
-
-        for c in self.constraints:
-            self.output.append("constraint " + c + ";")
-
-        return self
-
-    def make_importance(self):
-        result = "array[Comps, Flavs] of int: imp = array2d(Comps, Flavs, [\n"
-        result += self.construct_explicit(
-            self.structure.importance,
+        ]
+
+        yield "enum Comps = " + self.data.value("Comps")
+        yield "set of Comps: mustComps = " + self.data.value("mustComps")
+
+        yield "enum Flavs = " + self.data.value("Flavs")
+        yield "array[Comps] of set of Flavs: Flav = " + self.data.value("Flav")
+
+        yield "enum CompFlavs = {" + ", ".join(self.compflavs) + "};"
+        yield "enum CRes = " + self.data.value("CRes")
+        yield "enum NRes = " + self.data.value("NRes")
+        yield "enum Nodes = {" + ", ".join(self.structure.nodes) + "};"
+        yield "set of int: Nodes0 = {" + self.zero_node + "} union Nodes;\n"
+
+        yield "array [{0} union CompFlavs, Nodes0] of var 0..1: D;"
+        if self.presolve is not None:
+            yield self.make_placements()
+        yield model_output
+        yield from self.stream_sum("var int: totCost = ", self.tot_cost(), ";")
+        yield from self.stream_sum("var int: totCarb = ", self.tot_carb(), ";")
+        yield self.make_obj()
+        yield "solve maximize obj;"
+
+        if self.symmetry is not None:
+            yield "include \"lex_greatereq.mzn\";"
+
+        constraints = chain(
             [
-                (self.structure.components, "Comps"),
-                (self.structure.flavs, "Flavs")
+                "totCost <= " + str(self.structure.cost_budget),
+                "totCarb <= " + str(self.structure.carbon_budget)
             ],
-            lambda _ : "0"
+            self.zero_values(),
+            self.at_most_one(),
+            self.must_deploy(),
+            self.bigger_or_equal(),
+            self.target_not_in_mustcomps(),
+            self.sufficient_quantity(),
+            self.certain_amount(),
+            self.non_consumable_dependency(),
+            self.symmetry_breaking() if self.symmetry is not None else []
         )
-        return result
+        for c in constraints:
+            yield "constraint " + c + ";"
 
     def tot_cost(self):
-        to_sum = []
         for (c, f, r), v in self.structure.component_requirements.items():
             for n in self.structure.nodes:
                 if (
                     (n, r) in self.structure.node_cost
                     and self.structure.node_cost[(n, r)] != self.wbounds[r]
+                    and self.placed(c, f, n)
                 ):
-                    to_sum.append(
+                    yield (
                         str(v * self.structure.node_cost[n, r])
                         + " * "
                         + self.make_d(c, f, n)
                     )
 
-        return "\n\t+ ".join(to_sum)
-
     def tot_carb(self):
-        to_sum = []
         for cs in self.structure.components:
             for fs in self.flavours[cs]:
                 for js in self.structure.nodes:
+                    if not self.placed(cs, fs, js):
+                        continue
+
                     to_sum_internal = []
                     for cd in self.structure.components:
                         for fd in self.flavours[cd]:
@@ -162,6 +165,7 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
                                     (cd, comb) in self.mayUse
                                     and self.mayUse[(cd, comb)] == 1
                                     and (cs, fs, cd) in self.structure.energy_dependencies
+                                    and self.placed(cd, fd, jd)
                                 ):
                                     to_sum_internal.append(str(
                                         self.structure.energy_dependencies[(cs, fs, cd)]
@@ -186,48 +190,39 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
                             + " * "
                             + self.make_d(cs, fs, js)
                         )
-                    to_sum.append(partial)
-
-        return "\n\t+ ".join(to_sum)
+                    yield partial
 
     def zero_values(self):
-        result = [
-            "D[" + self.zero_node + ", " + j + "] = 0"
-            for j in self.nodes0
-        ]
+        if self.presolve is not None:
+            # Already zero in the fixed placements
+            return
 
-        for i in self.compflavs:
-            result.append(self.make_d_cf(i, self.zero_node) + " = 0")
+        for j in self.nodes0:
+            yield "D[" + self.zero_node + ", " + j + "] = 0"
 
-        return result
+        for i in self.compflavs:
+            yield self.make_d_cf(i, self.zero_node) + " = 0"
 
     def at_most_one(self):
-        result = []
-
         for c in self.structure.components:
             e = []
             for f in self.flavours[c]:
                 for j in self.structure.nodes:
-                    e.append(self.make_d(c, f, j))
-            result.append("\n\t+ ".join(e) + "\n\t<= 1")
-
-        return result
+                    if self.placed(c, f, j):
+                        e.append(self.make_d(c, f, j))
+            if len(e) > 0:
+                yield "\n\t+ ".join(e) + "\n\t<= 1"
 
     def must_deploy(self):
-        result = []
-
         for c in self.structure.must_components:
             e = []
             for f in self.flavours[c]:
                 for j in self.structure.nodes:
-                    e.append(self.make_d(c, f, j))
-            result.append("\n\t+ ".join(e) + "\n\t> 0")# /\\ node[" + c + "] > 0")
-
-        return result
+                    if self.placed(c, f, j):
+                        e.append(self.make_d(c, f, j))
+            yield self.make_sum(e) + "\n\t> 0" # /\\ node[" + c + "] > 0")
 
     def bigger_or_equal(self):
-        result = []
-
         for c in self.structure.components:
             for i in self.flavours[c]:
                 for cu in self.structure.components:
@@ -236,26 +231,30 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
 
                             lhs = []
                             for j in self.structure.nodes:
-                                lhs.append(self.make_d(c, i, j))
+                                if self.placed(c, i, j):
+                                    lhs.append(self.make_d(c, i, j))
+                            if len(lhs) == 0:
+                                continue
 
                             rhs = []
                             for k in self.flavours[cu]:
                                 if self.structure.importance[(cu, k)] >= self.structure.importance[(cu, iu)]:
                                     for j in self.structure.nodes:
-                                        rhs.append(self.make_d(cu, k, j))
+                                        if self.placed(cu, k, j):
+                                            rhs.append(self.make_d(cu, k, j))
 
-                            result.append("\n\t+ ".join(lhs) + "\n\t<=\n\t" + "\n\t+ ".join(rhs))
-        return result
+                            yield "\n\t+ ".join(lhs) + "\n\t<=\n\t" + self.make_sum(rhs)
 
     def target_not_in_mustcomps(self):
-        result = []
-
         for c in self.structure.components:
             lhs = []
             if c not in self.structure.must_components:
                 for f in self.flavours[c]:
                     for j in self.structure.nodes:
-                        lhs.append(self.make_d(c, f, j))
+                        if self.placed(c, f, j):
+                            lhs.append(self.make_d(c, f, j))
+                if len(lhs) == 0:
+                    continue
 
                 rhs = []
                 for cs in self.structure.components:
@@ -264,49 +263,51 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
                             comb = combine_comp_flav(cs, fs)
                             if (c, comb) in self.mayUse and self.mayUse[(c, comb)] == 1:
                                 for j in self.structure.nodes:
-                                    rhs.append(self.make_d(cs, fs, j))
+                                    if self.placed(cs, fs, j):
+                                        rhs.append(self.make_d(cs, fs, j))
 
-                result.append(
-                    "\n\t+ ".join(lhs) + "\n\t<=\n\t" + "\n\t+ ".join(rhs)
-                )
-        return result
+                yield "\n\t+ ".join(lhs) + "\n\t<=\n\t" + self.make_sum(rhs)
 
     def sufficient_quantity(self):
-        result = []
-        for j in self.structure.nodes:
-            for r in self.structure.consumable_resource:
-                lhs = []
-                if (j, r) in self.structure.node_capabilities:
-                    if self.structure.resource_minimization[r]:
-                        for c in self.structure.components:
-                            for i in self.flavours[c]:
-                                if (c, i, r) in self.structure.component_requirements and self.structure.component_requirements[(c, i, r)] != self.wbounds[r]:
-                                    lhs.append(
-                                        str(self.structure.component_requirements[(c, i, r)])
-                                        + " * " + self.make_d(c, i, j)
-                                    )
-                    else:
-                        raise ValueError("Consumable 'maximization' resources unsupported")
-
-                if len(lhs) > 0:
-                    result.append("\n\t+ ".join(lhs) + "\n\t<= " + str(self.structure.node_capabilities[(j, r)]))
-
-        return result
+        dense = self.dense
+        for j in range(1, len(dense.nodes0)):
+            for r in map(dense.resource_index.get, self.structure.consumable_resource):
+                if not dense.nodeCap_explicit[j, r]:
+                    continue
+                if not dense.minimization[r]:
+                    raise ValueError("Consumable 'maximization' resources unsupported")
+
+                requirements = dense.comReq[:, r]
+                required = dense.comReq_explicit[:, r] & (requirements != dense.worst[r])
+                if self.presolve is not None:
+                    required &= self.presolve.feasible[:, j]
+                required = np.flatnonzero(required)
+                if len(required) > 0:
+                    requirements = python_values(requirements, dense.comReq_integer[:, r])
+                    capability = python_values(dense.nodeCap[j], dense.nodeCap_integer[j])[r]
+                    yield ("\n\t+ ".join(
+                        str(requirements[cf])
+                        + " * " + self.make_d(*dense.compflavs[cf], dense.nodes0[j])
+                        for cf in required
+                    ) + "\n\t<= " + str(capability))
 
     def certain_amount(self):
+        if self.presolve is not None:
+            # Every placement left by the presolve satisfies them
+            return
+
         ncap = self.structure.node_capabilities | {
             ('0', r) : self.structure.best_bounds[r]
             for r in self.structure.resources
         }
 
-        result = []
         for j in self.nodes0:
             for c in self.structure.components:
                 for i in self.flavours[c]:
                     for r in self.structure.non_consumable_resource:
                         if (c, i, r) in self.structure.component_requirements and self.structure.component_requirements[(c, i, r)] != self.wbounds[r]:
                             if self.structure.resource_minimization[r]:
-                                result.append(
+                                yield (
                                     str(self.structure.component_requirements[(c, i, r)])
                                     + " * "
                                     + self.make_d(c, i, j)
@@ -314,7 +315,7 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
                                     + str(ncap[(j, r)] if (j, r) in ncap else 0)
                                 )
                             else:
-                                result.append(
+                                yield (
                                     str(self.structure.component_requirements[(c, i, r)])
                                     + " >= "
                                     + self.make_d(c, i, j)
@@ -324,8 +325,6 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
                                     + self.make_d(c, i, j)
                                 )
 
-        return result
-
     def non_consumable_dependency(self):
         max_rbound = max(self.structure.worst_bounds.values())
         min_rboud = min(self.structure.best_bounds.values())
@@ -346,77 +345,115 @@ class MZNUnrollTranslator(Translator): # MZN optimized with unroll format
             for n in self.structure.nodes
         }
 
-        result = []
-        for js in self.nodes0:
-          for jd in self.nodes0:
-            for r in self.structure.non_consumable_resource:
-              if (js, jd, r) in lcap and lcap[(js, jd, r)] != self.wbounds[r]:
-                for cs in self.structure.components:
-                  for fs in self.flavours[cs]:
-                    for cd in self.structure.components:
-                      for fd in self.flavours[cd]:
-                        if (cd, combine_comp_flav(cs, fs)) in self.mayUse and self.mayUse[(cd, combine_comp_flav(cs, fs))] == 1:
-                          if (cs, fs, cd, r) in self.structure.dependencies and self.structure.dependencies[(cs, fs, cd, r)] != self.wbounds[r]:
-                            if self.structure.resource_minimization[r]:
-                              result.append(
-                                str(self.structure.dependencies[(cs, fs, cd, r)])
-                                + " * " + self.make_d(cs, fs, js)
-                                + " * " + self.make_d(cd, fd, jd)
-                                + " <= "
-                                + str(lcap[(js, jd, r)])
-                            )
-                            else:
-                              result.append(
-                                str(self.structure.dependencies[(cs, fs, cd, r)])
-                                + " >= "
-                                + str(lcap[(js, jd, r)])
-                                + " * " + self.make_d(cs, fs, js)
-                                + " * " + self.make_d(cd, fd, jd)
-                            )
+        lcap = SparseTensor.from_dict(
+            lcap,
+            [self.nodes0, self.nodes0, self.structure.resources],
+            list(self.wbounds.values())
+        )
 
-        return result
+        # Dependencies with a requirement on each non consumable resource,
+        # only between components that may use each other
+        non_consumable = set(self.structure.non_consumable_resource)
+        dependencies = {}
+        for (cs, fs, cd, r), v in self.structure.dependency_tensor().items():
+            if r in non_consumable and self.mayUse.get((cd, combine_comp_flav(cs, fs))) == 1:
+                dependencies.setdefault(r, []).append((cs, fs, cd, v))
+
+        for (js, jd, r), l in lcap.items():
+            for cs, fs, cd, v in dependencies.get(r, []):
+                if not self.placed(cs, fs, js):
+                    continue
+                for fd in self.flavours[cd]:
+                    if not self.placed(cd, fd, jd):
+                        continue
+                    if self.structure.resource_minimization[r]:
+                        yield (
+                            str(v)
+                            + " * " + self.make_d(cs, fs, js)
+                            + " * " + self.make_d(cd, fd, jd)
+                            + " <= "
+                            + str(l)
+                        )
+                    else:
+                        yield (
+                            str(v)
+                            + " >= "
+                            + str(l)
+                            + " * " + self.make_d(cs, fs, js)
+                            + " * " + self.make_d(cd, fd, jd)
+                        )
+
+    def symmetry_breaking(self):
+        # Columns of interchangeable nodes in decreasing lexicographic order.
+        # The nodes of a class share their feasible placements
+        for nodes in self.symmetry.classes:
+            placements = [
+                (c, f)
+                for c in self.structure.components
+                for f in self.flavours[c]
+                if self.placed(c, f, nodes[0])
+            ]
+            if len(placements) == 0:
+                continue
+
+            for n1, n2 in zip(nodes, nodes[1:]):
+                yield (
+                    "lex_greatereq(["
+                    + ", ".join(self.make_d(c, f, n1) for c, f in placements)
+                    + "], ["
+                    + ", ".join(self.make_d(c, f, n2) for c, f in placements)
+                    + "])"
+                )
 
     def make_obj(self):
-        result = "var int: obj = " + "\n\t+ ".join(
-            str(self.structure.importance[(c, i)]) + " * (" + "\n\t\t+ ".join(self.make_d(c, i, j) for j in self.structure.nodes) + ")"
-            for c in self.structure.components
-            for i in self.flavours[c]
-        ) + ";\n"
+        terms = []
+        for c in self.structure.components:
+            for i in self.flavours[c]:
+                placements = [self.make_d(c, i, j) for j in self.structure.nodes if self.placed(c, i, j)]
+                if len(placements) > 0:
+                    terms.append(str(self.structure.importance[(c, i)]) + " * (" + "\n\t\t+ ".join(placements) + ")")
+
+        result = "var int: obj = " + self.make_sum(terms) + ";\n"
         return result
 
-    def to_string(self) -> str:
-        return "\n".join(self.output)
+    def make_placements(self):
+        # Infeasible placements are fixed to zero, the others are left free
+        return "D = " + self.data.value("D")
 
 class MZNUnrollSecondPhaseTranslator(MZNUnrollTranslator):
-    def __init__(self, structure):
-        super(MZNUnrollSecondPhaseTranslator, self).__init__(structure)
+    def __init__(
+        self,
+        structure,
+        presolve: Presolve = None,
+        symmetry: NodeSymmetry = None,
+        data: DataSection = None
+    ):
+        super(MZNUnrollSecondPhaseTranslator, self).__init__(structure, presolve, symmetry, data)
 
     def make_obj(self):
-        result = "var int: obj = " + "\n\t+ ".join([
+        result = "var int: obj = " + self.make_sum([
             self.make_d(c, i, j)
             for (c, i), j in self.structure.old_deployment.items()
         ]) + ";"
         return result
 
-    def translate(self):
-        super().translate()
+    def sections(self):
+        yield from super().sections()
 
         for (c, f), nodes in self.structure.constraints["avoid"].items():
             for n in nodes:
-                self.output.append(f"constraint {self.make_d(c, f, n)} = 0;")
+                yield f"constraint {self.make_d(c, f, n)} = 0;"
 
         for (c1, f1), list_tuple_comp_flavs in self.structure.constraints["affinity"].items():
             for c2, f2 in list_tuple_comp_flavs:
                 for j in self.structure.nodes:
-                    self.output.append(
+                    yield (
                         f"constraint {self.make_d(c1, f1, j)} * {self.make_d(c2, f2, j)} = 1;"
                     )
 
         for (c1, f1), list_tuple_comp_flavs in self.structure.constraints["antiaffinity"].items():
             for c2, f2 in list_tuple_comp_flavs:
                 for j in self.structure.nodes:
-                    self.output.append(
+                    yield (
                         f"constraint {self.make_d(c1, f1, j)} * {self.make_d(c2, f2, j)} = 0;"
                     )
-
-        return self
@@ -1,66 +1,141 @@
-from typing import Callable
-from itertools import product
-
-def batcher(iterable, n):
-    result = []
-    i = 0
-    while i < len(iterable):
-        result.append(iterable[i:i+n])
-        i += n
-    return result
-
-def matrix_creator(
-    batched_indexes: list[tuple],
-    indexes: list[tuple[set, str]],
+from collections import Counter
+from itertools import cycle
+
+import numpy as np
+
+def dense_cells(
     values: dict,
-    n: int,
-    no_value: Callable[[int], str]
-):
-    if n == 1:
-        return (
-            "\t" + ", ".join([
-                str(values[i]) if i in values else str(no_value(i))
-                for i in batched_indexes
-            ]) + ", % " + str(batched_indexes[0][-2])
-        )
-    if n == 2:
-        return (
-            "\t%" + ", ".join(indexes[-1][0]) + "\n" +
-            "\n".join([
-                matrix_creator(i, indexes, values, n - 1, no_value)
-                for i in batched_indexes
-            ])
-        )
+    indexes: list[tuple[list, str]],
+    default
+) -> np.ndarray:
+    # Dense array of the printed cells: the values given for the index tuples
+    # and `default` (a string, or strings broadcast over the shape) elsewhere.
+    # Values outside of the indexes are ignored
+    axes = [list(i.keys()) if isinstance(i, dict) else list(i) for i, _ in indexes]
+    positions = [{e : j for j, e in enumerate(a)} for a in axes]
+
+    cells = np.empty(tuple(len(a) for a in axes), dtype=object)
+    cells[...] = default
+
+    keys = []
+    printed = []
+    for key, v in values.items():
+        if all(k in p for k, p in zip(key, positions)):
+            keys.append([p[k] for k, p in zip(key, positions)])
+            printed.append(str(v))
+    if len(keys) > 0:
+        cells[tuple(np.array(keys, dtype=np.intp).T)] = printed
+
+    return cells
+
+def emit_dense(cells: np.ndarray, indexes: list[tuple[list, str]]) -> str:
+    # Commented layout of the MiniZinc arrays, a row per last but one index
+    # under a header naming the last index, for an already dense array of
+    # cells, built one row at a time
+    axes = [list(i.keys()) if isinstance(i, dict) else list(i) for i, _ in indexes]
+    if cells.dtype.kind not in "OU":
+        cells = cells.astype(str)
+
+    header = "\t%" + ", ".join(axes[-1]) + "\n"
+    if cells.size == 0:
+        return (header if len(axes) == 2 else "") + "\n]);"
+
+    lines = [
+        f"\t{', '.join(row)}, % {label}"
+        for row, label in zip(cells.reshape(-1, cells.shape[-1]).tolist(), cycle(axes[-2]))
+    ]
 
-    result = ""
-    for i, e in enumerate(batched_indexes):
-        idxs = indexes[0][0]
-        idx = list(idxs.keys())[i] if isinstance(idxs, dict) else idxs[i]
+    size = len(axes[-2])
+    blocks = [
+        header + "\n".join(lines[i:i + size])
+        for i in range(0, len(lines), size)
+    ]
+    for axis in reversed(axes[:-2]):
+        size = len(axis)
+        blocks = [
+            "".join(
+                "\n\t% " + label + "\n" + block + "\n"
+                for label, block in zip(axis, blocks[i:i + size])
+            )
+            for i in range(0, len(blocks), size)
+        ]
 
-        result += (
-            "\n\t% " + idx +
-            "\n" + matrix_creator(e, indexes[1:], values, n - 1, no_value) +
-            "\n"
+    return blocks[0] + "\n]);"
+
+def construct_dense(
+    values: dict,
+    indexes: list[tuple[list, str]],
+    default
+) -> str:
+    return emit_dense(dense_cells(values, indexes, default), indexes)
+
+# Arrays with at most this fraction of cells differing from the most common
+# value of their last index are written as a list of overrides
+SPARSE_DENSITY = 0.1
+
+def sparse_overrides(cells: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Most common value of each last index, and the flat positions (from 1)
+    # and values of the cells that differ from it
+    base = np.empty(cells.shape[-1], dtype=object)
+    for r in range(cells.shape[-1]):
+        base[r] = Counter(cells[..., r].ravel().tolist()).most_common(1)[0][0]
+
+    differ = (cells != base).astype(bool).reshape(-1)
+    return base, np.flatnonzero(differ) + 1, cells.reshape(-1)[differ]
+
+def emit_sparse(size: int, base: np.ndarray, positions: np.ndarray, values: np.ndarray) -> str:
+    # Flat array rebuilt by the model from the overrides, which are sorted
+    # and delimited by the sentinels 0 and size + 1: every cell is generated
+    # once, between two overrides or as an override
+    last = len(positions) + 1
+    chunk = 20
+
+    def listing(elements: list[str]) -> str:
+        return ",\n\t\t".join(
+            ", ".join(elements[i:i + chunk])
+            for i in range(0, len(elements), chunk)
         )
-    return result
 
-def construct_explicit(
+    return (
+        "let {\n"
+        + "\tarray[int] of int: base = [" + ", ".join(base.tolist()) + "],\n"
+        + f"\tarray[0..{last}] of int: at = array1d(0..{last}, [\n\t\t"
+        + listing(["0"] + [str(p) for p in positions.tolist()] + [str(size + 1)]) + "\n\t]),\n"
+        + f"\tarray[0..{last}] of int: value = array1d(0..{last}, [\n\t\t"
+        + listing(["0"] + [str(v) for v in values.tolist()] + ["0"]) + "\n\t])\n"
+        + "} in [\n"
+        + f"\tif p = at[k] then value[k] else base[(p - 1) mod {len(base)} + 1] endif\n"
+        + f"\t| k in 1..{last}, p in at[k - 1] + 1..min(at[k], {size})\n"
+        + "]);"
+    )
+
+def construct_array(
+    initial: str,
     values: dict,
-    indexes: list[tuple[set, str]],
-    no_value: Callable[[int], str]
+    indexes: list[tuple[list, str]],
+    default,
+    sparse: bool = False,
+    separator: str = ""
 ) -> str:
-    only_indexes = list(product(*(i[0] for i in indexes)))
-    batched_indexes = only_indexes
-    for index_values, _ in list(reversed(indexes))[:-1]:
-        batched_indexes = batcher(batched_indexes, len(index_values))
-
-    return matrix_creator(
-        batched_indexes,
-        indexes,
-        values,
-        len(indexes),
-        no_value
-    ) + "\n]);"
+    # initial opens the array literal, which the sparse form replaces
+    cells = dense_cells(values, indexes, default)
+    if sparse and cells.size > 0:
+        base, positions, overrides = sparse_overrides(cells)
+        if len(positions) <= SPARSE_DENSITY * cells.size:
+            return initial.removesuffix("\n").removesuffix("[") + emit_sparse(
+                cells.size,
+                base,
+                positions,
+                overrides
+            )
+    return initial + separator + emit_dense(cells, indexes)
+
+def bound_names(structure, worst: bool = True) -> np.ndarray:
+    # Worst (or best) bound of each resource, by name
+    return np.array([
+        "MIN_RBOUNDS" if structure.resource_minimization[r] == worst else "MAX_RBOUNDS"
+        for r in structure.resources
+    ], dtype=object)
 
 def combine_comp_flav(c, f):
     separator = "_"
@@ -1,12 +1,34 @@
+from typing import Iterator, TextIO
+
 from src.language.intermediate_language import IntermediateStructure
 
 class Translator:
     def __init__(self, structure: IntermediateStructure):
         self.structure = structure
+        self.output = None
 
-    def to_string(self) -> str:
+    def sections(self) -> Iterator[str]:
+        # Pieces of the output in order, separated by a new line
         raise NotImplementedError("Please implement this method")
 
+    def translate(self):
+        self.output = list(self.sections())
+        return self
+
+    def to_string(self) -> str:
+        if self.output is None:
+            self.translate()
+        return "\n".join(self.output)
+
+    def write_to(self, stream: TextIO):
+        # Each piece is written as soon as it is produced, the whole output
+        # is never held in memory
+        separator = ""
+        for section in self.sections():
+            stream.write(separator)
+            stream.write(section)
+            separator = "\n"
+
     def write_to_file(self, file_path: str):
         with open(file_path, "w") as file:
-            file.write(self.to_string())
+            self.write_to(file)
@@ -9,40 +9,42 @@ class ZephyrusTranslator(Translator):
     def __init__(self, struct: IntermediateStructure):
         super(ZephyrusTranslator, self).__init__(struct)
 
-        self.output = []
-
         self.zephyrus_components = [
             self.combine_comp_flav(c, f)
             for c, flav in struct.flavours.items()
             for f in flav
         ]
+        self.ports = len(self.zephyrus_components)
+        self.multi_provide_ports = len(self.zephyrus_components)
+
+    def sections(self):
+        struct = self.structure
 
-        self.output.append(
+        yield (
             "comps = 1.." + str(len(self.zephyrus_components)) + ";"
         )
-        self.output.append("locations = 1.." + str(len(struct.nodes)) + ";")
-        self.output.append("resources = 1.." + str(len(struct.resources)) + ";\n")
+        yield "locations = 1.." + str(len(struct.nodes)) + ";"
+        yield "resources = 1.." + str(len(struct.resources)) + ";\n"
 
-        self.output.append(
+        yield (
             "resource_provisions = [|" +
             "|".join(str(r) for (_, _), r in struct.node_capabilities.items()) +
             "|];"
         )
 
-        self.output.append(
+        yield (
             "resource_consumptions = [|" +
             "|".join(str(r) for (_, _, _), r in struct.component_requirements.items()) +
             "|];"
         )
 
-        self.output.append(
+        yield (
             "costs = [" +
             ",".join(str(r) for (_, _), r in struct.node_cost.items()) +
             "];"
         )
 
-        self.ports = len(self.zephyrus_components)
-        self.output.append("\nports = 1.." + str(self.ports) + ";")
+        yield "\nports = 1.." + str(self.ports) + ";"
 
         self.requirement_port_nums = []
         for c, flav in struct.flavours.items():
@@ -56,17 +58,16 @@ class ZephyrusTranslator(Translator):
                     row.extend(["0"] * self.ports)
                 self.requirement_port_nums.append("\t" + ", ".join(row))
 
-        self.output.append(
+        yield (
             "requirement_port_nums = [|\n" +
             "|\n".join(self.requirement_port_nums) +
             "\n|];"
         )
 
-        self.output.append("conflicts = array2d(comps, ports, [false | c in comps, p in ports]);")
+        yield "conflicts = array2d(comps, ports, [false | c in comps, p in ports]);"
 
-        self.multi_provide_ports = len(self.zephyrus_components)
-        self.output.append("multi_provide_ports = 1.." + str(self.multi_provide_ports) + ";")
-        self.output.append("multi_provides = array2d(multi_provide_ports, ports, [true | m in multi_provide_ports, p in ports]);")
+        yield "multi_provide_ports = 1.." + str(self.multi_provide_ports) + ";"
+        yield "multi_provides = array2d(multi_provide_ports, ports, [true | m in multi_provide_ports, p in ports]);"
 
         # Importance are all flat, so we can just keep track of each component
         provide = {
@@ -84,19 +85,15 @@ class ZephyrusTranslator(Translator):
                         for _ in f2s
                     ]
                 ))
-        self.output.append(
+        yield (
             "provide_port_nums = [|\n" +
             "|\n".join(self.provide_port_nums) +
             "\n|];"
         )
 
-        self.output.append("must = [" +
+        yield ("must = [" +
             ", ".join(
                 "true" if c in struct.must_components else "false"
                 for c, _ in struct.flavours.items()
             ) +
         "];")
-
-
-    def to_string(self) -> str:
-        return "\n".join(self.output)